@@ -0,0 +1,174 @@
+# asset_loader.py
+# Carga de assets guiada por un manifiesto (data/assets.json). Lo que necesita el menú
+# se carga al arrancar; el resto se lee y decodifica en un hilo y se termina de preparar
+# (convert_alpha, escalado, variantes) en el hilo principal, poco a poco, con pump().
+import io
+import json
+import queue
+import threading
+import time
+
+import pygame
+import utils.constants as constants
+from game_log import get_logger
+from image_cache import image_cache
+from utils.constants import *
+
+log = get_logger("assets")
+
+ASSET_MANIFEST_FILE = "data/assets.json"
+ASSET_SIZES = {"tile": (TILE_SIZE, TILE_SIZE), "screen": (SCREEN_WIDTH, SCREEN_HEIGHT)}
+
+
+class NullSound:
+    """Sonido mudo con la interfaz de pygame.mixer.Sound que usa el juego."""
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_length(self):
+        return 0.0
+
+
+class AssetEntry:
+    """Un asset del manifiesto: imagen (atributo de Game), tile (Game.tile_images) o sonido."""
+    __slots__ = ("kind", "name", "path", "size", "alpha", "variants", "placeholder", "group")
+
+    def __init__(self, kind, name, path, size=None, alpha=True, variants=False, placeholder="PURPLE", group="game"):
+        self.kind = kind
+        self.name = name # Nombre del atributo de Game, o tipo de tile para kind == "tile"
+        self.path = path
+        self.size = ASSET_SIZES.get(size, size) # None = tamaño original
+        self.alpha = alpha
+        self.variants = variants # Generar variantes tintadas (IMAGE_TINTS)
+        self.placeholder = getattr(constants, placeholder) # Color si el fichero falta
+        self.group = group # "menu" se carga antes del primer frame; "game", en segundo plano
+
+
+class AssetLoader:
+    def __init__(self, game, manifest_path=ASSET_MANIFEST_FILE, null_sounds=False):
+        self.game = game
+        self.null_sounds = null_sounds # Todos los sonidos mudos (sin dispositivo de audio)
+        self.entries = self._read_manifest(manifest_path)
+        self.remaining = len(self.entries) # Entradas que aún no están en Game
+        self.decoded = queue.Queue() # (entrada, datos, error) que el hilo deja para el hilo principal
+        self.thread = None
+        self.missing = [] # Rutas sustituidas por placeholders
+        self.loaded_groups = set() # Grupos cargados con load_group (no van al hilo)
+        self.start_time = time.perf_counter()
+        self.load_time_ms = None # Tiempo hasta tener todos los assets (se informa al acabar)
+
+    @staticmethod
+    def _read_manifest(path):
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError) as e:
+            log.warning("No se pudo leer el manifiesto de assets %s: %s", path, e)
+            return []
+        entries = [AssetEntry("image", **image) for image in manifest.get("images", [])]
+        entries += [AssetEntry("tile", getattr(constants, tile_name), path, "tile", variants=True)
+                    for tile_name, path in manifest.get("tiles", {}).items()]
+        entries += [AssetEntry("sound", name, path) for name, path in manifest.get("sounds", {}).items()]
+        return entries
+
+    @property
+    def is_done(self):
+        return self.remaining == 0
+
+    def load_group(self, group):
+        """Carga ya (en este hilo) las entradas de un grupo, p. ej. "menu"."""
+        self.loaded_groups.add(group)
+        for entry in self.entries:
+            if entry.group == group:
+                self._install(entry, *self._decode(entry))
+
+    def start_background(self):
+        """Lanza el hilo que decodifica el resto de entradas."""
+        if self.thread is not None:
+            return
+        pending = [entry for entry in self.entries if entry.group not in self.loaded_groups]
+        if not pending:
+            self._check_done()
+            return
+        self.thread = threading.Thread(target=self._decode_all, args=(pending,), name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def pump(self, budget_ms=4):
+        """Prepara en el hilo principal lo que el hilo ya decodificó, hasta agotar budget_ms.
+        Pensado para llamarse una vez por frame. Devuelve True cuando ya no queda nada."""
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        while not self.is_done and time.perf_counter() < deadline:
+            try:
+                entry, data, error = self.decoded.get_nowait()
+            except queue.Empty:
+                break
+            self._install(entry, data, error)
+        return self.is_done
+
+    def finish(self):
+        """Espera a que todo esté cargado (p. ej. antes de empezar a jugar)."""
+        if self.thread is None and not self.is_done:
+            self.start_background()
+        while not self.is_done:
+            try:
+                self._install(*self.decoded.get(timeout=0.1))
+            except queue.Empty:
+                if not self.thread.is_alive() and self.decoded.empty(): # El hilo murió: no llegará nada más
+                    raise RuntimeError(f"La carga de assets se detuvo con {self.remaining} pendientes")
+
+    def _decode_all(self, entries):
+        for entry in entries:
+            self.decoded.put((entry, *self._decode(entry)))
+
+    @staticmethod
+    def _decode(entry):
+        """Parte que puede ir en otro hilo: leer del disco y decodificar. Devuelve (datos, error)."""
+        try:
+            if entry.kind == "sound":
+                with open(entry.path, 'rb') as f:
+                    return f.read(), None
+            return pygame.image.load(entry.path), None
+        except Exception as e: # Cualquier fallo (también de una entrada mal escrita): placeholder
+            return None, e
+
+    def _install(self, entry, data, error):
+        """Parte del hilo principal: convertir al formato de la pantalla y guardar en Game."""
+        if error is not None:
+            log.warning("Error al cargar asset %s (%s) Usando placeholder.", entry.path, error)
+            self.missing.append(entry.path)
+
+        if entry.kind == "sound":
+            value = NullSound()
+            if data is not None and not self.null_sounds and pygame.mixer.get_init():
+                try:
+                    value = pygame.mixer.Sound(file=io.BytesIO(data))
+                except pygame.error as e:
+                    log.warning("Error al cargar sonido %s: %s. Se usará uno mudo.", entry.path, e)
+                    self.missing.append(entry.path)
+        elif data is None:
+            value = image_cache.get_placeholder(entry.size or (TILE_SIZE, TILE_SIZE), entry.placeholder)
+        else:
+            value = data.convert_alpha() if entry.alpha else data.convert()
+            if entry.size and value.get_size() != entry.size:
+                value = pygame.transform.scale(value, entry.size)
+
+        if entry.kind == "tile":
+            self.game.tile_images[entry.name] = value
+        else:
+            setattr(self.game, entry.name, value)
+        if entry.variants:
+            self.game.build_image_variants(value)
+
+        self.remaining -= 1
+        self._check_done()
+
+    def _check_done(self):
+        if self.is_done and self.load_time_ms is None:
+            self.load_time_ms = (time.perf_counter() - self.start_time) * 1000.0
+            log.info("Assets cargados en %.0f ms (%d sustituidos por placeholders).", self.load_time_ms, len(self.missing))
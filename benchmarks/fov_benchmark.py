@@ -0,0 +1,118 @@
+# benchmarks/fov_benchmark.py
+# Compara la latencia por turno de Map.update_fov (shadowcasting) con la aproximación
+# anterior por rayos (72 rayos x fov_radius pasos, repetida en los 8 octantes). La
+# comparación es sin la caché LRU de FOV (cada turno se recalcula); con caché se mide
+# aparte, con sus aciertos, porque el paseo aleatorio repite muchas casillas.
+#
+# Uso: python benchmarks/fov_benchmark.py [--width 60] [--height 45] [--turns 300]
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from dungeon_generator import Map
+from room import Room
+from utils.constants import *
+
+
+def build_map(width, height, max_rooms, seed, fov_cache_size=0):
+    """Genera habitaciones y pasillos sin contenido (no necesita ventana ni assets)."""
+    rng = random.Random(seed)
+    game_map = Map(SimpleNamespace(config={"fov_enabled": True, "fov_cache_size": fov_cache_size}), width, height)
+    rooms = []
+    for _ in range(max_rooms):
+        w, h = rng.randint(6, 12), rng.randint(6, 12)
+        room = Room(None, rng.randint(1, width - w - 1), rng.randint(1, height - h - 1), w, h, len(rooms))
+        if any(room.intersect(other) for other in rooms):
+            continue
+        room.create_room(game_map.tiles, TILE_GARAGE_FLOOR)
+        if rooms:
+            (new_x, new_y), (prev_x, prev_y) = map(lambda c: (int(c[0]), int(c[1])), (room.center, rooms[-1].center))
+            game_map._create_h_tunnel(prev_x, new_x, prev_y, TILE_ROAD)
+            game_map._create_v_tunnel(prev_y, new_y, new_x, TILE_ROAD)
+        rooms.append(room)
+        game_map.register_room(room)
+    return game_map
+
+
+def random_walk(game_map, turns, seed):
+    """Secuencia de posiciones de un paseo aleatorio por tiles caminables."""
+    rng = random.Random(seed)
+    walkable = game_map.get_walkable_tiles_in_rect(pygame.Rect(0, 0, game_map.width, game_map.height))
+    x, y = rng.choice(walkable)
+    positions = []
+    for _ in range(turns):
+        dx, dy = rng.choice([(0, -1), (0, 1), (-1, 0), (1, 0)])
+        if game_map.is_walkable(x + dx, y + dy):
+            x, y = x + dx, y + dy
+        positions.append((x, y))
+    return positions
+
+
+def legacy_update_fov(game_map, player_x, player_y):
+    """Réplica del update_fov/_cast_light original, solo para comparar."""
+    for x_v in range(game_map.width):
+        for y_v in range(game_map.height):
+            if game_map.visibility_map[x_v][y_v] == 2:
+                game_map.visibility_map[x_v][y_v] = 1
+    game_map.visibility_map[player_x][player_y] = 2
+    for octant in range(8):
+        for angle in range(0, 360, 5):
+            rad = angle * (3.14159 / 180.0)
+            for r in range(1, game_map.fov_radius + 1):
+                map_x = player_x + int(r * pygame.math.Vector2(1, 0).rotate_rad(rad).x)
+                map_y = player_y + int(r * pygame.math.Vector2(1, 0).rotate_rad(rad).y)
+                if 0 <= map_x < game_map.width and 0 <= map_y < game_map.height:
+                    game_map.visibility_map[map_x][map_y] = 2
+                    if not game_map.is_transparent(map_x, map_y):
+                        break
+
+
+def time_turns(fov_function, game_map, positions):
+    game_map.visibility_map.fill(0)
+    samples = []
+    for x, y in positions:
+        start = time.perf_counter()
+        fov_function(game_map, x, y)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<16} media {statistics.mean(samples):8.3f} ms   mediana {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de FOV por turno")
+    parser.add_argument("--width", type=int, default=MAP_WIDTH)
+    parser.add_argument("--height", type=int, default=MAP_HEIGHT)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    game_map = build_map(args.width, args.height, args.rooms, args.seed)
+    cached_map = build_map(args.width, args.height, args.rooms, args.seed, fov_cache_size=256)
+    positions = random_walk(game_map, args.turns, args.seed)
+    print(f"Mapa {args.width}x{args.height}, {len(game_map.room_rects)} habitaciones, {args.turns} turnos, radio {game_map.fov_radius}")
+
+    legacy = time_turns(legacy_update_fov, game_map, positions)
+    current = time_turns(Map.update_fov, game_map, positions)
+    cached = time_turns(Map.update_fov, cached_map, positions)
+    report("rayos (antiguo)", legacy)
+    report("shadowcasting", current)
+    report("con caché LRU", cached)
+    print(f"  caché: {cached_map.fov_cache_hits} aciertos, {cached_map.fov_cache_misses} fallos")
+    print(f"Aceleración sin caché (mediana): x{statistics.median(legacy) / statistics.median(current):.1f}")
+
+
+if __name__ == "__main__":
+    main()
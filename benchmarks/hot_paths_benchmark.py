@@ -0,0 +1,185 @@
+# benchmarks/hot_paths_benchmark.py
+# Latencia de los caminos calientes del juego (generación, FOV, turno de enemigos y
+# dibujado) para cada combinación de tamaño de mapa, número de habitaciones y de enemigos.
+# Usa el juego real en modo headless (ver headless.py) y guarda los resultados en JSON
+# para poder comparar ejecuciones con --compare.
+# update_fov se mide sin la caché LRU de FOV (coste real de recalcular) y, aparte,
+# update_fov_cached con la caché y sus aciertos.
+#
+# Se ejecuta desde la raíz del repositorio (los datos y assets usan rutas relativas).
+# Uso: python benchmarks/hot_paths_benchmark.py [--sizes 60x45,120x90] [--rooms 10,30]
+#          [--enemies 0,200] [--turns 100] [--output hot_paths.json] [--compare anterior.json]
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+import pygame
+from camera import Camera
+from dungeon_generator import Map
+from enemy import Enemy
+from enemy_archetypes import get_archetypes
+from fov_benchmark import random_walk
+from headless import HeadlessGame
+from level_generator import LevelBuilder
+from utils.constants import *
+
+HOT_PATHS = ("generate_dungeon", "update_fov", "update_fov_cached", "process_enemy_turn", "map_draw", "playing_draw")
+
+
+def parse_list(text, convert=int):
+    return [convert(value) for value in text.split(",") if value]
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def summarize(samples):
+    """Mediana, p95 y media en ms de una lista de muestras en ms."""
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {"median_ms": statistics.median(samples), "p95_ms": p95,
+            "mean_ms": statistics.mean(samples), "samples": len(samples)}
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000.0
+
+
+def setup_level(headless, width, height, max_rooms, enemy_count, seed):
+    """PlayingState con un nivel de las dimensiones pedidas y, si hace falta, más enemigos
+    (en tiles libres de las habitaciones) hasta llegar a enemy_count."""
+    headless.new_game(seed)
+    game = headless.game
+    state = headless.state
+    state.current_map = Map(game, width, height)
+    state.camera = Camera(state.player, width, height)
+    state._initialize_level(LevelBuilder(game, state.current_level_number, width, height, max_rooms).build())
+    state.turn_count = 0
+
+    current_map = state.current_map
+    free_tiles = [(x, y) for room_tiles in current_map.room_tiles for x, y in room_tiles
+                  if not current_map.occupancy.is_occupied(x, y)
+                  and (x, y) not in (current_map.player_start_pos, current_map.exit_pos)]
+    random.shuffle(free_tiles)
+    enemy_types = list(get_archetypes())
+    for x, y in free_tiles[:max(0, enemy_count - len(state.enemies))]:
+        enemy = Enemy(game, x, y, random.choice(enemy_types), room_rect=current_map.get_room_at(x, y))
+        state.spawn_enemy(enemy)
+    return state
+
+
+def run_config(headless, width, height, max_rooms, enemy_count, turns, generations, seed):
+    game = headless.game
+    random.seed(seed) # Enemigos añadidos por setup_level
+    timings = {name: [] for name in HOT_PATHS}
+
+    game.new_run(seed)
+    for level_number in range(1, generations + 1): # Una mazmorra distinta por muestra
+        builder = LevelBuilder(game, level_number, width, height, max_rooms)
+        timings["generate_dungeon"].append(timed(builder.current_map.generate_dungeon, builder, builder.rng, max_rooms=max_rooms))
+
+    state = setup_level(headless, width, height, max_rooms, enemy_count, seed)
+    current_map = state.current_map
+    player = state.player
+    # La salida cambia de estado (transición o victoria): el paseo no la pisa
+    positions = [position for position in random_walk(current_map, turns, seed) if position != current_map.exit_pos]
+
+    # update_fov sin caché: el paseo repite casillas y la LRU respondería la mayoría
+    cache_size = current_map.fov_cache_size
+    current_map.fov_cache_size = 0
+    current_map.fov_cache.clear()
+    walked = []
+    for x, y in positions:
+        if current_map.occupancy.is_occupied(x, y, ("enemy", "obstacle")):
+            continue # Los enemigos se mueven: no poner al jugador encima de uno
+        walked.append((x, y))
+        player.x, player.y = x, y
+        player.current_hp = player.max_hp # Que el jugador no muera a mitad de la medición
+        timings["update_fov"].append(timed(current_map.update_fov, x, y))
+        timings["process_enemy_turn"].append(timed(state.process_enemy_turn))
+        timings["map_draw"].append(timed(current_map.draw, game.screen, state.camera))
+        timings["playing_draw"].append(timed(state.draw, game.screen))
+        if game.current_state is not state:
+            break # El jugador ha muerto igualmente: se informa con las muestras que haya
+
+    # El mismo recorrido con la caché LRU del juego, aparte y con sus aciertos
+    current_map.fov_cache_size = cache_size
+    hits, misses = current_map.fov_cache_hits, current_map.fov_cache_misses
+    for x, y in walked:
+        timings["update_fov_cached"].append(timed(current_map.update_fov, x, y))
+    fov_cache = {"hits": current_map.fov_cache_hits - hits, "misses": current_map.fov_cache_misses - misses}
+
+    return {"width": width, "height": height, "max_rooms": max_rooms, "enemy_count": enemy_count,
+            "rooms": len(current_map.room_rects), "enemies": len(state.enemies), "turns": len(timings["update_fov"]),
+            "fov_cache": fov_cache,
+            "timings": {name: summarize(samples) for name, samples in timings.items() if samples}}
+
+
+def report(result, baseline=None):
+    print(f"Mapa {result['width']}x{result['height']}, {result['rooms']} habitaciones "
+          f"(max_rooms {result['max_rooms']}), {result['enemies']} enemigos, {result['turns']} turnos")
+    for name, timing in result["timings"].items():
+        line = f"  {name:<20} mediana {timing['median_ms']:8.3f} ms   p95 {timing['p95_ms']:8.3f} ms"
+        if baseline and name in baseline["timings"]:
+            line += f"   x{baseline['timings'][name]['median_ms'] / timing['median_ms']:.2f} vs. anterior"
+        print(line)
+    print(f"  caché de FOV (update_fov_cached): {result['fov_cache']['hits']} aciertos, {result['fov_cache']['misses']} fallos")
+
+
+def config_key(result):
+    return (result["width"], result["height"], result["max_rooms"], result["enemy_count"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los caminos calientes del juego")
+    parser.add_argument("--sizes", type=lambda text: parse_list(text, parse_size), default="60x45,120x90",
+                        help="Tamaños de mapa ANCHOxALTO separados por comas")
+    parser.add_argument("--rooms", type=parse_list, default="10,30", help="Valores de max_rooms de generate_dungeon")
+    parser.add_argument("--enemies", type=parse_list, default="0,200",
+                        help="Enemigos por nivel (0 = los que salgan al generar)")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=20, help="Mazmorras generadas por configuración")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="hot_paths.json", help="Fichero JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar las medianas")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de log del juego (los mensajes ensucian el informe)")
+    args = parser.parse_args()
+
+    baselines = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding="utf-8") as f:
+            baselines = {config_key(result): result for result in json.load(f)["results"]}
+
+    headless = HeadlessGame(render=False, log_level=args.log_level)
+
+    results = []
+    for width, height in args.sizes:
+        for max_rooms in args.rooms:
+            for enemy_count in args.enemies:
+                result = run_config(headless, width, height, max_rooms, enemy_count,
+                                    args.turns, args.generations, args.seed)
+                report(result, baselines.get(config_key(result)))
+                results.append(result)
+
+    with open(args.output, 'w', encoding="utf-8") as f:
+        json.dump({"meta": {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                            "pygame": pygame.version.ver, "numpy": numpy.__version__, "platform": platform.platform(),
+                            "seed": args.seed, "turns": args.turns, "generations": args.generations},
+                   "results": results}, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,107 @@
 # dungeon_generator.py
-import random
+from collections import OrderedDict
+import numpy as np
 import pygame
+from fov import compute_fov
+from game_log import get_logger
+from occupancy import OccupancyGrid
+from pathfinding import compute_distance_field, find_path
 from room import Room
 from utils.constants import *
 
+# --- Tablas de propiedades de los tiles ---
+# Indexadas por el tipo de tile (uint8), permiten consultar un tile o una matriz entera de golpe.
+TILE_WALKABLE = np.zeros(TILE_OBJECT + 1, dtype=bool)
+TILE_WALKABLE[[TILE_ROAD, TILE_GARAGE_FLOOR, TILE_ENTRANCE, TILE_EXIT]] = True
+
+TILE_TRANSPARENT = np.ones(TILE_OBJECT + 1, dtype=bool)
+TILE_TRANSPARENT[[TILE_WALL, TILE_OBJECT, TILE_ABYSS]] = False # Abismo también bloquea
+
+log = get_logger("generation")
+
+RENDER_CHUNK_TILES = 16 # Lado (en tiles) de cada chunk del fondo pre-renderizado
+
 class Map:
     def __init__(self, game, width, height):
         self.game = game
         self.width = width
         self.height = height
-        # Inicializa todo el mapa como ABISMO (negro)
-        self.tiles = [[TILE_ABYSS for _ in range(self.height)] for _ in range(self.width)]
+        # Inicializa todo el mapa como ABISMO (negro). Matriz uint8 indexada [x, y]
+        self.tiles = np.full((self.width, self.height), TILE_ABYSS, dtype=np.uint8)
 
         # --- FOV y Niebla de Guerra ---
         # 0: HIDDEN, 1: EXPLORED, 2: VISIBLE
-        self.visibility_map = [[0 for _ in range(self.height)] for _ in range(self.width)]
+        self.visibility_map = np.zeros((self.width, self.height), dtype=np.uint8)
         self.fov_radius = 8 # Radio de visión del jugador en tiles
+        self.visible_cells = frozenset() # Tiles VISIBLE en este turno (para degradarlos en el siguiente)
+        self.all_visible = False # True si el FOV está desactivado y ya se marcó todo el mapa
+
+        # --- Caché LRU de FOV ---
+        # Clave: (x, y, fov_radius, revision). Cualquier cambio de transparencia sube la revisión,
+        # así que una entrada antigua nunca puede coincidir con el mapa actual.
+        self.revision = 0
+        self.fov_cache = OrderedDict()
+        self.fov_cache_size = self.game.config.get("fov_cache_size", 256)
+        self.fov_cache_hits = 0
+        self.fov_cache_misses = 0
+
+        # --- Fondo pre-renderizado (ver draw) ---
+        self.render_chunks = {} # (chunk_x, chunk_y) -> Surface
+        self.render_revision = -1 # Revisión del mapa con la que se pintaron los chunks
+        self.render_full_redraw = True
+        self.dirty_render_cells = set() # Tiles cuya visibilidad cambió desde el último draw
 
         self.player_start_pos = None
         self.exit_pos = None # Asegúrate de que exit_pos esté inicializado
         self.obstacles = []
         self.room_rects = [] 
+        # Id de habitación por tile (índice en room_rects, -1 fuera de habitaciones) y sus tiles
+        self.room_ids = np.full((self.width, self.height), -1, dtype=np.int16)
+        self.room_tiles = [] # room_tiles[id] -> lista de (x, y) de esa habitación
+        self.occupancy = OccupancyGrid() # Enemigos, obstáculos, ítems y pickups por tile
+
+        # --- Navegación de enemigos ---
+        self._passable_grid = None # Lista [x][y]: caminable y sin obstáculo
+        self._passable_revision = -1
+        self.player_flow_field = {} # (x, y) -> pasos hasta el jugador (ver get_player_flow_field)
+        self._flow_field_key = None
+        self.flow_field_builds = 0
+        self.path_requests = 0 # Búsquedas A* realizadas (ver find_path)
+        self.path_cache_hits = 0 # Pasos dados reutilizando un camino ya calculado
    
 
     # Ayudante: Para crear un pasillo horizontal
     def _create_h_tunnel(self, x1, x2, y, tile_type):
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            if 0 <= x < self.width and 0 <= y < self.height:
-                if self.tiles[x][y] != TILE_GARAGE_FLOOR:
-                    self.tiles[x][y] = tile_type
+        if not 0 <= y < self.height:
+            return
+        segment = self.tiles[max(0, min(x1, x2)):max(x1, x2) + 1, y]
+        segment[segment != TILE_GARAGE_FLOOR] = tile_type
 
     # Ayudante: Para crear un pasillo vertical
     def _create_v_tunnel(self, y1, y2, x, tile_type):
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            if 0 <= x < self.width and 0 <= y < self.height:
-                if self.tiles[x][y] != TILE_GARAGE_FLOOR:
-                    self.tiles[x][y] = tile_type
-
-    def generate_dungeon(self, playing_state, max_rooms=10, min_room_size=6, max_room_size=12):
-        """Genera una mazmorra con habitaciones y pasillos."""
-        # --- LIMPIAR ESTADO DEL MAPA ANTERIOR ---
-        self.tiles = [[TILE_ABYSS for _ in range(self.height)] for _ in range(self.width)]
-        self.player_start_pos = None
-        self.exit_pos = None
-        self.visibility_map = [[0 for _ in range(self.height)] for _ in range(self.width)] # Reiniciar FOV
-        self.room_rects = [] # Limpiar la lista de rectángulos de habitaciones
-        # self.obstacles se limpia en playing_state.place_obstacles() si es necesario
+        if not 0 <= x < self.width:
+            return
+        segment = self.tiles[x, max(0, min(y1, y2)):max(y1, y2) + 1]
+        segment[segment != TILE_GARAGE_FLOOR] = tile_type
+
+    def generate_dungeon(self, playing_state, rng, max_rooms=10, min_room_size=6, max_room_size=12):
+        """Genera una mazmorra con habitaciones y pasillos.
+
+        `playing_state` recibe el contenido de las habitaciones (spawn_enemy, spawn_item):
+        normalmente un LevelBuilder (ver level_generator). `rng` es el random.Random de
+        generación del nivel (ver GameRandom.for_level).
+        """
+        self._reset_level()
 
         rooms = []
         num_rooms = 0
 
         for r in range(max_rooms):
             # Dimensiones y posición aleatorias de la habitación
-            w = random.randint(min_room_size, max_room_size)
-            h = random.randint(min_room_size, max_room_size)
-            x = random.randint(1, self.width - w - 1) # Asegura espacio para paredes
-            y = random.randint(1, self.height - h - 1)
+            w = rng.randint(min_room_size, max_room_size)
+            h = rng.randint(min_room_size, max_room_size)
+            x = rng.randint(1, self.width - w - 1) # Asegura espacio para paredes
+            y = rng.randint(1, self.height - h - 1)
 
             # Crea un rectángulo para representar la habitación
             #new_room = pygame.Rect(x, y, w, h)
@@ -80,7 +126,7 @@ class Map:
                 # Y luego rellenar el interior con TILE_ROAD.
 
                 # Guarda el rectángulo de la habitación (para colocar obstáculos, etc.)
-                self.room_rects.append(new_room)
+                self.register_room(new_room)
 
                 # Conecta la nueva habitación con la anterior si no es la primera
                 if num_rooms > 0:
@@ -91,7 +137,7 @@ class Map:
                     prev_x, prev_y = prev_room.center
 
                     # Conecta con pasillos (aleatoriamente horizontal y luego vertical, o viceversa)
-                    if random.randint(0, 1) == 1:
+                    if rng.randint(0, 1) == 1:
                         self._create_h_tunnel(prev_x, new_x, prev_y, TILE_ROAD)
                         self._create_v_tunnel(prev_y, new_y, new_x, TILE_ROAD)
                     else:
@@ -99,7 +145,7 @@ class Map:
                         self._create_h_tunnel(prev_x, new_x, new_y, TILE_ROAD)
 
                  # --- Generar contenido de la habitación ---
-                new_room.generate_contents(playing_state) # Pasar la instancia de PlayingState
+                new_room.generate_contents(playing_state, rng)
                 
                 rooms.append(new_room)
                 num_rooms += 1
@@ -113,178 +159,295 @@ class Map:
             start_y_options = [first_room.top -1, first_room.bottom]
             
             #Elegir aleatoriamente una pared (arriba, abajo, izquierda, derecha)
-            if random.choice([True, False]): # Pared vertical (izquierda o derecha)
-                self.player_start_pos = (random.choice(start_x_options), random.randint(first_room.top, first_room.bottom -1))
+            if rng.choice([True, False]): # Pared vertical (izquierda o derecha)
+                self.player_start_pos = (rng.choice(start_x_options), rng.randint(first_room.top, first_room.bottom -1))
             else: # Pared horizontal (arriba o abajo)
-                self.player_start_pos = (random.randint(first_room.left, first_room.right-1), random.choice(start_y_options))
+                self.player_start_pos = (rng.randint(first_room.left, first_room.right-1), rng.choice(start_y_options))
 
             # Asegurarse de que la posición de inicio esté dentro de los límites del mapa
             self.player_start_pos = (max(0, min(self.player_start_pos[0], self.width - 1)),
                                      max(0, min(self.player_start_pos[1], self.height - 1)))
-            self.tiles[self.player_start_pos[0]][self.player_start_pos[1]] = TILE_ENTRANCE
+            self.tiles[self.player_start_pos] = TILE_ENTRANCE
 
             last_room = rooms[-1]
             # Seleccionar una pared de la última habitación para la salida
             exit_x_options = [last_room.left -1, last_room.right]
             exit_y_options = [last_room.top -1, last_room.bottom]
 
-            if random.choice([True, False]):
-                self.exit_pos = (random.choice(exit_x_options), random.randint(last_room.top, last_room.bottom -1))
+            if rng.choice([True, False]):
+                self.exit_pos = (rng.choice(exit_x_options), rng.randint(last_room.top, last_room.bottom -1))
             else:
-                self.exit_pos = (random.randint(last_room.left, last_room.right-1), random.choice(exit_y_options))
+                self.exit_pos = (rng.randint(last_room.left, last_room.right-1), rng.choice(exit_y_options))
             
             self.exit_pos = (max(0, min(self.exit_pos[0], self.width - 1)),
                              max(0, min(self.exit_pos[1], self.height - 1)))
-            self.tiles[self.exit_pos[0]][self.exit_pos[1]] = TILE_EXIT
+            self.tiles[self.exit_pos] = TILE_EXIT
+
+        log.info("Mazmorra generada con %d habitaciones.", num_rooms)
 
-        print(f"Mazmorra generada con {num_rooms} habitaciones.")
+        # El mapa es nuevo: las entradas de FOV del nivel anterior ya no sirven
+        self.bump_revision()
+        self.fov_cache.clear()
 
-        # Opcional: Rellenar las zonas restantes fuera de los caminos con TILE_WALL
-        for x in range(self.width):
-            for y in range(self.height):
-                if self.tiles[x][y] == TILE_ABYSS: # Solo si sigue siendo abismo
-                    self.tiles[x][y] = TILE_ABYSS # Convierte el abismo no usado en pared      
+    def _reset_level(self):
+        """Limpia el estado del nivel anterior antes de generar o adoptar uno nuevo."""
+        self.tiles.fill(TILE_ABYSS)
+        self.player_start_pos = None
+        self.exit_pos = None
+        self.visibility_map.fill(0) # Reiniciar FOV
+        self.visible_cells = frozenset()
+        self.all_visible = False
+        self.obstacles = []
+        self.room_rects = [] # Limpiar la lista de rectángulos de habitaciones
+        self.room_ids.fill(-1)
+        self.room_tiles = []
+        self.occupancy.clear() # Las entidades del nivel anterior ya no existen
+
+    def load_snapshot(self, snapshot):
+        """Adopta el mapa de un LevelSnapshot (tiles, habitaciones, entrada y salida).
+        Las entidades las crea PlayingState."""
+        self._reset_level()
+        self.tiles[:] = snapshot.tiles
+        for level, (x, y, w, h) in enumerate(snapshot.rooms):
+            room = Room(self.game, x, y, w, h, level)
+            room.topleft = (x, y) # Room.__init__ recoloca el rect al asignar center: dejar el guardado
+            self.register_room(room)
+        self.player_start_pos = snapshot.player_start_pos
+        self.exit_pos = snapshot.exit_pos
+        self.bump_revision()
+        self.fov_cache.clear()
     
+    def bump_revision(self):
+        """Marca que el mapa cambió de forma que puede afectar al FOV (tiles, obstáculos...)."""
+        self.revision += 1
+
+    def set_tile(self, x, y, tile_type):
+        """Cambia un tile tras la generación (p. ej. abrir o bloquear un paso) e invalida el FOV cacheado."""
+        if self.tiles[x, y] != tile_type:
+            self.tiles[x, y] = tile_type
+            self.bump_revision()
+
+    def register_room(self, room):
+        """Añade la habitación a room_rects y marca sus tiles en room_ids. Devuelve su id."""
+        room_id = len(self.room_rects)
+        self.room_rects.append(room)
+        # Mismo área que Room.collidepoint: [left, right) x [top, bottom)
+        left, top = max(0, room.left), max(0, room.top)
+        area = self.room_ids[left:min(self.width, room.right), top:min(self.height, room.bottom)]
+        area[:] = room_id
+        xs, ys = np.nonzero(area == room_id)
+        self.room_tiles.append(list(zip((xs + left).tolist(), (ys + top).tolist())))
+        return room_id
+
+    def get_passable_grid(self):
+        """Lista [x][y] de bools: tile caminable y sin obstáculo. Se recalcula solo si cambia la revisión."""
+        if self._passable_revision != self.revision:
+            passable = TILE_WALKABLE[self.tiles]
+            for x, y in self.occupancy.layers["obstacle"]:
+                passable[x, y] = False
+            self._passable_grid = passable.tolist()
+            self._passable_revision = self.revision
+        return self._passable_grid
+
+    def get_player_flow_field(self, player_x, player_y):
+        """Mapa de distancias (BFS) hacia el jugador, compartido por todos los enemigos.
+
+        Se calcula como mucho una vez por posición del jugador y revisión del mapa,
+        y solo si algún enemigo lo pide en ese turno.
+        """
+        key = (player_x, player_y, self.revision)
+        if self._flow_field_key != key:
+            self.player_flow_field = compute_distance_field(self.get_passable_grid(), (player_x, player_y))
+            self._flow_field_key = key
+            self.flow_field_builds += 1
+        return self.player_flow_field
+
+    def find_path(self, start, goal, blocked=()):
+        """Servicio de A* para los enemigos: camino de start a goal evitando paredes y obstáculos.
+
+        Los tiles con otros enemigos tienen un coste extra (se rodean si se puede) y los de
+        `blocked` no se pisan. Devuelve la lista de pasos o None si no hay camino.
+        """
+        self.path_requests += 1
+        return find_path(self.get_passable_grid(), start, goal,
+                         soft_cells=self.occupancy.layers["enemy"], blocked=blocked)
+
+    def get_room_id_at(self, x, y):
+        """Id (índice en room_rects) de la habitación en (x, y), o -1."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.room_ids[x, y])
+        return -1
+
     def get_room_at(self, x, y):
         """Devuelve el objeto Room en las coordenadas (x,y) o None si no está en ninguna habitación."""
-        for room in self.room_rects: # room_rects es una lista de objetos Room
-            if room.collidepoint(x, y): # pygame.Rect.collidepoint usa coordenadas de tile aquí
-                return room
-        return None
+        room_id = self.get_room_id_at(x, y)
+        return self.room_rects[room_id] if room_id >= 0 else None
     
     def get_tile_at(self, x, y):
         # Esta función es crucial para is_walkable.
         # Si las coordenadas están fuera de los límites del mapa, es ABISMO.
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.tiles[x][y]
+            return int(self.tiles[x, y])
         return TILE_ABYSS # Si está fuera de los límites del mapa, siempre es ABISMO
 
     def is_walkable(self, x, y):
         # Utiliza get_tile_at para obtener el tipo de tile (maneja los límites automáticamente)
-        tile = self.get_tile_at(x, y)
+        # Solo ROAD, GARAGE_FLOOR, ENTRANCE y EXIT son caminables (ver TILE_WALKABLE)
+        return bool(TILE_WALKABLE[self.get_tile_at(x, y)])
 
-        # Solo estos tipos de tiles son caminables
-        return tile == TILE_ROAD or \
-               tile == TILE_GARAGE_FLOOR or \
-               tile == TILE_ENTRANCE or \
-               tile == TILE_EXIT
+    def get_walkable_mask(self):
+        """Devuelve una matriz booleana [x, y] con los tiles caminables del mapa."""
+        return TILE_WALKABLE[self.tiles]
+
+    def get_walkable_tiles_in_rect(self, rect):
+        """Devuelve la lista de coordenadas (x, y) caminables dentro de un rectángulo (p. ej. un Room)."""
+        left, top = max(0, rect.left), max(0, rect.top)
+        right, bottom = min(self.width, rect.right), min(self.height, rect.bottom)
+        if left >= right or top >= bottom:
+            return []
+        xs, ys = np.nonzero(TILE_WALKABLE[self.tiles[left:right, top:bottom]])
+        return list(zip((xs + left).tolist(), (ys + top).tolist()))
 
 
     def draw(self, screen, camera):
-        """Dibuja el mapa usando placeholders de color."""
-        # Calcula los límites de los tiles visibles para la cámara
-        start_tile_x = max(0, -camera.offset_x // TILE_SIZE)
-        end_tile_x = min(self.width, (-camera.offset_x + camera.camera_width) // TILE_SIZE + 1)
-        start_tile_y = max(0, -camera.offset_y // TILE_SIZE)
-        end_tile_y = min(self.height, (-camera.offset_y + camera.camera_height) // TILE_SIZE + 1)
-
-         # --- DIBUJAR LOS TILES DEL MAPA PRIMERO ---
-        for x in range(start_tile_x, end_tile_x):
-            for y in range(start_tile_y, end_tile_y):
-                tile_type = self.tiles[x][y]
-                tile_rect_world  = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                tile_rect_screen = camera.apply(tile_rect_world)
-                visibility = self.visibility_map[x][y] if self.game.config.get("fov_enabled", True) else 2
-
-                if visibility == 0: # HIDDEN
-                    pygame.draw.rect(screen, BLACK, tile_rect_screen) # O no dibujar nada
-                else:
-                    tile_image = self.game.tile_images.get(tile_type)
-                    if tile_image:
-                        img_to_draw = tile_image.copy()
-                        if visibility == 1: # EXPLORED (pero no visible)
-                            # Aplicar un tinte oscuro
-                            dark_surface = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert_alpha()
-                            dark_surface.fill((0, 0, 0, 150)) # Negro con transparencia
-                            img_to_draw.blit(dark_surface, (0,0))
-                        screen.blit(img_to_draw, tile_rect_screen)
-                    else: # Placeholder de color si no hay imagen
-                        color = BLACK 
-                        if tile_type == TILE_ROAD: color = COLOR_ROAD
-                        elif tile_type == TILE_WALL: color = COLOR_WALL
-                        elif tile_type == TILE_GARAGE_FLOOR: color = COLOR_GARAGE_FLOOR
-                        elif tile_type == TILE_ENTRANCE: color = COLOR_ENTRANCE
-                        elif tile_type == TILE_EXIT: color = COLOR_EXIT
-                        elif tile_type == TILE_ABYSS: color = COLOR_ABYSS
-                        elif tile_type == TILE_OBJECT: color = COLOR_OBJECT
-                        
-                        if visibility == 1: # Tinte para explorado
-                            r, g, b = color
-                            color = (max(0, r-100), max(0, g-100), max(0, b-100))
-                        pygame.draw.rect(screen, color, tile_rect_screen)
-                
+        """Dibuja el mapa a partir del fondo precalculado por chunks.
+
+        Cada chunk es una Surface de RENDER_CHUNK_TILES x RENDER_CHUNK_TILES tiles con los
+        tiles y obstáculos ya compuestos según su visibilidad. Solo se vuelven a pintar los
+        tiles cuya visibilidad cambió, así que un frame son unos pocos blits.
+        """
+        self._refresh_render_chunks()
+
+        chunk_px = RENDER_CHUNK_TILES * TILE_SIZE
+        start_chunk_x = max(0, -camera.offset_x // chunk_px)
+        end_chunk_x = (-camera.offset_x + camera.camera_width) // chunk_px + 1
+        start_chunk_y = max(0, -camera.offset_y // chunk_px)
+        end_chunk_y = (-camera.offset_y + camera.camera_height) // chunk_px + 1
+
+        for chunk_x in range(start_chunk_x, end_chunk_x):
+            for chunk_y in range(start_chunk_y, end_chunk_y):
+                chunk = self.render_chunks.get((chunk_x, chunk_y))
+                if chunk: # Los chunks sin ningún tile descubierto no existen (quedan en negro)
+                    screen.blit(chunk, (chunk_x * chunk_px + camera.offset_x, chunk_y * chunk_px + camera.offset_y))
+
+    def _refresh_render_chunks(self):
+        """Vuelve a pintar en los chunks los tiles pendientes (o todo si el mapa cambió)."""
+        if self.render_revision != self.revision or self.render_full_redraw:
+            # Nivel nuevo, obstáculos nuevos o cambio global de visibilidad: repintar lo descubierto
+            self.render_chunks = {}
+            self.render_revision = self.revision
+            self.render_full_redraw = False
+            self.dirty_render_cells = set()
+            xs, ys = np.nonzero(self.visibility_map)
+            cells = zip(xs.tolist(), ys.tolist())
+        elif self.dirty_render_cells:
+            cells = self.dirty_render_cells
+            self.dirty_render_cells = set()
+        else:
+            return
+
+        for x, y in cells:
+            self._render_cell(x, y)
+
+    def _render_cell(self, x, y):
+        """Pinta un tile (y su obstáculo, si lo hay) en su chunk según su visibilidad."""
+        visibility = int(self.visibility_map[x, y])
+        chunk_key = (x // RENDER_CHUNK_TILES, y // RENDER_CHUNK_TILES)
+        chunk = self.render_chunks.get(chunk_key)
+        if chunk is None:
+            if visibility == 0: # HIDDEN: no hace falta crear el chunk
+                return
+            chunk = pygame.Surface((RENDER_CHUNK_TILES * TILE_SIZE, RENDER_CHUNK_TILES * TILE_SIZE))
+            chunk.fill(BLACK)
+            self.render_chunks[chunk_key] = chunk
+
+        cell_rect = pygame.Rect((x % RENDER_CHUNK_TILES) * TILE_SIZE, (y % RENDER_CHUNK_TILES) * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        chunk.fill(BLACK, cell_rect)
+        if visibility == 0: # HIDDEN
+            return
+
+        tile_type = int(self.tiles[x, y])
+        tile_image = self.game.tile_images.get(tile_type)
+        if tile_image:
+            chunk.blit(self._get_image_variant(tile_image, visibility), cell_rect)
+        else: # Placeholder de color si no hay imagen
+            color = BLACK 
+            if tile_type == TILE_ROAD: color = COLOR_ROAD
+            elif tile_type == TILE_WALL: color = COLOR_WALL
+            elif tile_type == TILE_GARAGE_FLOOR: color = COLOR_GARAGE_FLOOR
+            elif tile_type == TILE_ENTRANCE: color = COLOR_ENTRANCE
+            elif tile_type == TILE_EXIT: color = COLOR_EXIT
+            elif tile_type == TILE_ABYSS: color = COLOR_ABYSS
+            elif tile_type == TILE_OBJECT: color = COLOR_OBJECT
+            
+            if visibility == 1: # Tinte para explorado
+                r, g, b = color
+                color = (max(0, r-100), max(0, g-100), max(0, b-100))
+            chunk.fill(color, cell_rect)
+
+        # Los obstáculos se pintan encima del tile, con el mismo tinte
+        obstacle = self.occupancy.get("obstacle", x, y)
+        if obstacle:
+            chunk.blit(self._get_image_variant(obstacle.image, visibility), cell_rect)
+
+    def _get_image_variant(self, image, visibility):
+        """Devuelve la imagen tal cual (VISIBLE) o su variante "explored" precalculada (EXPLORED)."""
+        if visibility != 1:
+            return image
+        return self.game.get_image_variant(image, "explored")
 
-        # --- DIBUJAR LOS OBSTÁCULOS DESPUÉS DE LOS TILES ---        
-        for obstacle in self.obstacles:
-            # Solo dibujar si el tile del obstáculo es visible o explorado
-            visibility = self.visibility_map[obstacle.x][obstacle.y] if self.game.config.get("fov_enabled", True) else 2
-            if visibility > 0: # VISIBLE o EXPLORED
-                obstacle_rect_world = obstacle.get_rect()
-                screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT) # Para culling
-                if camera.apply(obstacle_rect_world).colliderect(screen_rect):
-                    img_to_draw = obstacle.image.copy()
-                    if visibility == 1: # EXPLORED
-                        dark_surface = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert_alpha()
-                        dark_surface.fill((0, 0, 0, 150))
-                        img_to_draw.blit(dark_surface, (0,0)) 
-                    screen.blit(img_to_draw, camera.apply(obstacle_rect_world))
-                    
     def is_transparent(self, x, y):
         """Determina si un tile bloquea la visión."""
         if 0 <= x < self.width and 0 <= y < self.height:
             # Los tiles de suelo, carretera, entrada, salida son transparentes.
-            # Las paredes y obstáculos bloquean la visión.
-            tile = self.tiles[x][y]
-            return tile not in [TILE_WALL, TILE_OBJECT, TILE_ABYSS] # Abismo también bloquea
+            # Las paredes y obstáculos bloquean la visión (ver TILE_TRANSPARENT).
+            return bool(TILE_TRANSPARENT[self.tiles[x, y]])
         return False # Fuera del mapa bloquea la visión
 
     def update_fov(self, player_x, player_y):
-        """Calcula el campo de visión del jugador."""
-        if not self.game.config.get("fov_enabled", True): # Si FOV está desactivado, todo visible
-            for x in range(self.width):
-                for y in range(self.height):
-                    self.visibility_map[x][y] = 2 # VISIBLE
-            return
-
-        # Primero, todos los tiles que eran VISIBLE ahora son EXPLORED
-        for x_v in range(self.width):
-            for y_v in range(self.height):
-                if self.visibility_map[x_v][y_v] == 2: # Si era VISIBLE
-                    self.visibility_map[x_v][y_v] = 1 # Ahora es EXPLORED
+        """Calcula el campo de visión del jugador.
 
-        # El tile del jugador siempre es visible
-        self.visibility_map[player_x][player_y] = 2 # VISIBLE
-
-        # Algoritmo de Shadow Casting (simplificado para 8 octantes)
-        for octant in range(8):
-            self._cast_light(player_x, player_y, 1, 1.0, 0.0, octant)
-
-    def _cast_light(self, cx, cy, row, start_slope, end_slope, octant):
-        if start_slope < end_slope:
+        Solo se tocan los tiles visibles del turno anterior (pasan a EXPLORED) y los del
+        turno actual, así que el coste depende del área de visión y no del tamaño del mapa.
+        """
+        if not self.game.config.get("fov_enabled", True): # Si FOV está desactivado, todo visible
+            if not self.all_visible: # Basta con marcarlo una vez por nivel
+                self.visibility_map.fill(2) # VISIBLE
+                self.all_visible = True
+                self.render_full_redraw = True
             return
 
-        for i in range(row, self.fov_radius + 1):
-            blocked = False
-            dx, dy = -i, -i # Para iterar sobre las celdas de la fila actual del octante
-            for j in range(i + 1): # Iterar sobre las celdas de la fila
-                # Transformar coordenadas según el octante
-                # Esta es la parte compleja del Shadow Casting, mapear (i, j) a (map_x, map_y)
-                # según el octante.
-                # Por simplicidad, aquí usaremos una aproximación de "círculo"
-                # y luego refinaremos si es necesario.
-                # Esta es una implementación MUY simplificada y no es Shadow Casting real.
-                # Para un Shadow Casting correcto, se necesitan transformaciones por octante.
-                # --- INICIO APROXIMACIÓN SIMPLE (CÍRCULO) ---
-                for angle in range(0, 360, 5): # Comprobar rayos en varias direcciones
-                    rad = angle * (3.14159 / 180.0)
-                    for r in range(1, self.fov_radius + 1):
-                        map_x = cx + int(r * pygame.math.Vector2(1, 0).rotate_rad(rad).x)
-                        map_y = cy + int(r * pygame.math.Vector2(1, 0).rotate_rad(rad).y)
-
-                        if 0 <= map_x < self.width and 0 <= map_y < self.height:
-                            self.visibility_map[map_x][map_y] = 2 # VISIBLE
-                            if not self.is_transparent(map_x, map_y): # Si el tile bloquea la luz
-                                break # Detener este rayo
-                return # Salir después de la aproximación simple
-                # --- FIN APROXIMACIÓN SIMPLE ---
-                # El código de Shadow Casting real iría aquí, manejando pendientes y octantes.
+        if self.all_visible: # Se reactivó el FOV: lo que se veía pasa a explorado
+            self.visibility_map[self.visibility_map == 2] = 1
+            self.all_visible = False
+            self.render_full_redraw = True
+
+        self._set_visible_cells(self.get_visible_cells(player_x, player_y))
+
+    def get_visible_cells(self, x, y):
+        """Conjunto de tiles visibles desde (x, y), usando la caché LRU si es posible."""
+        key = (x, y, self.fov_radius, self.revision)
+        visible = self.fov_cache.get(key)
+        if visible is not None:
+            self.fov_cache_hits += 1
+            self.fov_cache.move_to_end(key)
+            return visible
+
+        self.fov_cache_misses += 1
+        # Symmetric shadowcasting en los 8 octantes (incluye el tile del jugador)
+        visible = frozenset(compute_fov(self.tiles, TILE_TRANSPARENT, x, y, self.fov_radius))
+        if self.fov_cache_size > 0:
+            self.fov_cache[key] = visible
+            if len(self.fov_cache) > self.fov_cache_size:
+                self.fov_cache.popitem(last=False) # Descartar la menos usada
+        return visible
+
+    def _set_visible_cells(self, visible):
+        """Degrada los tiles visibles del turno anterior a EXPLORED y marca los nuevos como VISIBLE."""
+        if self.visible_cells:
+            xs, ys = zip(*self.visible_cells)
+            self.visibility_map[xs, ys] = 1 # EXPLORED
+        xs, ys = zip(*visible)
+        self.visibility_map[xs, ys] = 2 # VISIBLE
+        self.dirty_render_cells |= self.visible_cells ^ visible # Solo los que cambiaron de estado
+        self.visible_cells = visible
@@ -1,38 +1,74 @@
 # enemy.py
 import pygame
-import random
-from item import Armor, Consumable, Weapon
+from enemy_store import StoreField
+from enemy_archetypes import get_archetype
+from game_log import get_logger
 from utils.constants import *
 
+ai_log = get_logger("ai")
+combat_log = get_logger("combat")
+
 class Enemy:
+    # Atributos que viven en el EnemyStore del nivel cuando el enemigo está en uno
+    x = StoreField("x")
+    y = StoreField("y")
+    current_hp = StoreField("current_hp")
+    max_hp = StoreField("max_hp")
+    attack = StoreField("attack")
+    defense = StoreField("defense")
+    special_attack_cooldown = StoreField("special_attack_cooldown")
+    surprise_timer = StoreField("surprise_timer")
+    state = StoreField("state")
+    is_alive = StoreField("is_alive")
+
+    # Todos los enemigos de un tipo comparten tamaño y velocidad
+    width = TILE_SIZE
+    height = TILE_SIZE
+    speed = ENEMY_SPEED
+
+    # Sin __dict__ por instancia: lo común a un tipo vive en el arquetipo y los stats en el EnemyStore
+    __slots__ = ("game", "enemy_type", "archetype", "patrol_target", "path", "path_goal", "path_revision",
+                 "last_known_player_pos", "home_room_rect",
+                 "_store", "_store_index", "_unstored")
+
     def __init__(self, game, x, y, enemy_type="basic_grunt", room_rect=None):
+        self._store = None # EnemyStore al que pertenece (ver EnemyStore.add)
+        self._store_index = -1
+        self._unstored = {} # Valores de los StoreField hasta entrar en un EnemyStore
         self.game = game # Referencia al objeto Game principal
         self.x = x       # Posición en coordenadas de tile
         self.y = y       # Posición en coordenadas de tile
-        self.width = TILE_SIZE
-        self.height = TILE_SIZE
-        self.speed = ENEMY_SPEED
+
+        self.enemy_type = enemy_type
+        self.archetype = get_archetype(enemy_type) # Stats, imagen, drops e IA del tipo (data/enemies.json)
 
         # --- Estadísticas de combate ---
-        self.max_hp = 30
+        self.max_hp = self.archetype.max_hp
         self.current_hp = self.max_hp
-        self.attack = 10 # Daño base que inflige
-        self.defense = 2 # Reducción de daño
+        self.attack = self.archetype.attack # Daño base que inflige
+        self.defense = self.archetype.defense # Reducción de daño
 
         self.is_alive = True # Nuevo atributo para saber si está vivo
-        self.enemy_type = enemy_type
 
         # --- IA de Estados ---
         self.state = "idle"  # "idle", "surprised", "alert", "attack"
         self.surprise_timer = 0  # Turnos restantes en estado sorprendido
         self.patrol_target = None  # Coordenadas (x,y) para patrullar en estado "alert"
+        self.path = [] # Pasos pendientes del camino A* cacheado hacia path_goal
+        self.path_goal = None
+        self.path_revision = -1 # Revisión del mapa con la que se calculó el camino
         self.last_known_player_pos = None
         self.home_room_rect = room_rect # Habitación de origen para patrullar
-        self.name = self.enemy_type.replace('_', ' ').title() # Para mensajes
         self.special_attack_cooldown = 0 # Cooldown para ataques especiales
 
+    @property
+    def name(self):
+        return self.archetype.name # Para mensajes
 
-        self.load_stats_and_image_by_type()
+    @property
+    def image(self):
+        image = getattr(self.game, self.archetype.image_key, None)
+        return image or self.game.enemy_image # Fallback si no está cargada
 
     def take_damage(self, damage):
         """Calcula el daño recibido y actualiza HP."""
@@ -41,12 +77,13 @@ class Enemy:
 
         actual_damage = max(1, damage - self.defense)
         self.current_hp -= actual_damage
-        print(f"Enemigo en ({self.x}, {self.y}) recibió {actual_damage} de daño. HP restantes: {self.current_hp}/{self.max_hp}")
+        combat_log.debug("Enemigo en (%d, %d) recibió %s de daño. HP restantes: %s/%s", self.x, self.y, actual_damage, self.current_hp, self.max_hp)
+        self.game.current_state.flash_damage(self)
 
         if self.current_hp <= 0:
             self.current_hp = 0 # Asegurarse de que no baje de 0
             self.is_alive = False
-            print(f"Enemigo en ({self.x}, {self.y}) ha sido derrotado.")
+            combat_log.debug("Enemigo en (%d, %d) ha sido derrotado.", self.x, self.y)
             return True # Enemigo derrotado
         return False # Enemigo no derrotado
 
@@ -55,13 +92,13 @@ class Enemy:
         damage = self.attack # Daño base del enemigo
         actual_damage = max(0, damage - target_player.defense) # Daño real tras defensa
 
-        print(f"{self.name} ataca a Player. Daño base: {damage}, Daño real: {actual_damage}")
+        combat_log.debug("%s ataca a Player. Daño base: %s, Daño real: %s", self.name, damage, actual_damage)
 
         player_defeated = target_player.take_damage(actual_damage)
 
        # --- Lógica de efecto de estado ---
-        if self.enemy_type == "acid_spitter": # Ejemplo si el ataque normal también puede corroer
-            if random.random() < 0.2: # 20% de probabilidad de corroer en ataque normal
+        if self.archetype.corrode_on_hit_chance and not player_defeated: # Tipos cuyo ataque normal también puede corroer
+            if self.game.rng.ai.random() < self.archetype.corrode_on_hit_chance:
                 target_player.apply_effect("corroded", duration=3, potency=2) # Reduce defensa en 2 por 3 turnos
                 self.game.current_state.show_message("¡Tu equipo se CORROE!")
 
@@ -81,7 +118,7 @@ class Enemy:
         if dy_total != 0:
             possible_steps.append((0, 1 if dy_total > 0 else -1))
         
-        random.shuffle(possible_steps) # Añade algo de variabilidad si ambas direcciones son válidas
+        self.game.rng.ai.shuffle(possible_steps) # Añade algo de variabilidad si ambas direcciones son válidas
 
         for dx, dy in possible_steps:
             new_x = self.x + dx
@@ -90,8 +127,7 @@ class Enemy:
             if not current_map.is_walkable(new_x, new_y):
                 continue
 
-            collides_with_obstacle = any(obs.x == new_x and obs.y == new_y for obs in current_map.obstacles)
-            if collides_with_obstacle:
+            if current_map.occupancy.is_occupied(new_x, new_y, ("obstacle",)):
                 continue
 
             # Evitar colisión con el jugador a menos que el objetivo sea el jugador y estemos atacando
@@ -99,32 +135,23 @@ class Enemy:
                 if target_pos != player_pos_for_collision_check: # Si el objetivo no es el jugador, no chocar
                     continue
 
-            collides_with_other_enemy = any(
-                other_enemy is not self and other_enemy.x == new_x and other_enemy.y == new_y
-                for other_enemy in all_enemies if other_enemy.is_alive
-            )
-            if collides_with_other_enemy:
+            if current_map.occupancy.is_occupied(new_x, new_y, ("enemy",)): # Otro enemigo vivo
                 continue
             
-            self.x = new_x
-            self.y = new_y
+            current_map.occupancy.move("enemy", self, new_x, new_y)
             # self.game.sound_move.play() # El sonido se puede gestionar en PlayingState o aquí
             return True # Movimiento exitoso
         return False # No se pudo mover
 
-    def _behavior_idle(self, player, current_map):
-        if self._get_distance_to_player(player) <= 2:
-            self.state = "surprised"
-            self.surprise_timer = 1 # 1 turno de sorpresa
-            self.game.current_state.show_message(f"¡{self.name} te ha visto!")
-            print(f"{self.name} cambió a estado: surprised")
+    def _notice_player(self):
+        self.state = "surprised"
+        self.surprise_timer = 1 # 1 turno de sorpresa
+        self.game.current_state.show_message(f"¡{self.name} te ha visto!")
+        ai_log.debug("%s cambió a estado: surprised", self.name)
 
-    def _behavior_surprised(self, player, current_map):
-        self.surprise_timer -= 1
-        if self.surprise_timer <= 0:
-            self.state = "attack"
-            print(f"{self.name} cambió a estado: attack (desde surprised)")
-        # El enemigo no hace nada más en este estado (vulnerable)
+    def _recover_from_surprise(self):
+        self.state = "attack"
+        ai_log.debug("%s cambió a estado: attack (desde surprised)", self.name)
 
     def _behavior_alert(self, player, current_map, all_enemies):
         player_room = current_map.get_room_at(player.x, player.y)
@@ -133,10 +160,11 @@ class Enemy:
         if player_room and enemy_room and player_room == enemy_room and self._get_distance_to_player(player) <= 5 : # Ve al jugador en la misma habitación
             self.state = "attack"
             self.patrol_target = None
-            print(f"{self.name} cambió a estado: attack (desde alert, jugador en misma habitación)")
+            ai_log.debug("%s cambió a estado: attack (desde alert, jugador en misma habitación)", self.name)
             return
 
-        if not self.patrol_target or (self.x == self.patrol_target[0] and self.y == self.patrol_target[1]):
+        if not self.patrol_target or (self.x == self.patrol_target[0] and self.y == self.patrol_target[1]) or \
+           current_map.occupancy.is_occupied(self.patrol_target[0], self.patrol_target[1], ("enemy",)): # Otro enemigo llegó antes
             target_room_to_patrol = self.home_room_rect
             if self.last_known_player_pos: # Si tiene una última posición conocida del jugador
                 room_of_last_pos = current_map.get_room_at(self.last_known_player_pos[0], self.last_known_player_pos[1])
@@ -144,8 +172,15 @@ class Enemy:
                     target_room_to_patrol = room_of_last_pos
             
             if target_room_to_patrol: # Patrulla la habitación (home o donde vio al jugador)
-                self.patrol_target = (random.randint(target_room_to_patrol.left, target_room_to_patrol.right -1),
-                                      random.randint(target_room_to_patrol.top, target_room_to_patrol.bottom -1))
+                # Solo tiles alcanzables (sin obstáculos), para no perseguir destinos imposibles
+                passable = current_map.get_passable_grid()
+                room_id = current_map.get_room_id_at(target_room_to_patrol.left, target_room_to_patrol.top)
+                candidates = [(x, y) for x, y in current_map.room_tiles[room_id] if passable[x][y]] if room_id >= 0 else []
+                if candidates:
+                    self.patrol_target = self.game.rng.ai.choice(candidates)
+                else:
+                    self.patrol_target = (self.game.rng.ai.randint(target_room_to_patrol.left, target_room_to_patrol.right -1),
+                                          self.game.rng.ai.randint(target_room_to_patrol.top, target_room_to_patrol.bottom -1))
             elif self.last_known_player_pos: # Si no hay habitación pero sí última pos, ir allí
                  self.patrol_target = self.last_known_player_pos
             else: # Movimiento aleatorio si no hay objetivo claro
@@ -153,39 +188,97 @@ class Enemy:
                 return
 
         if self.patrol_target:
-            self._move_towards_target(self.patrol_target, current_map, all_enemies, (player.x, player.y))
-
-    def _behavior_attack(self, player, current_map, all_enemies):
-        dist_to_player = self._get_distance_to_player(player)
-        player_room = current_map.get_room_at(player.x, player.y)
-        enemy_room = current_map.get_room_at(self.x, self.y)
-
-        if dist_to_player > 5 and (player_room != enemy_room or not player_room or not enemy_room) : # Jugador lejos Y en diferente contexto de habitación
-            self.state = "alert"
-            self.last_known_player_pos = (player.x, player.y)
-            self.patrol_target = None
-            print(f"{self.name} cambió a estado: alert (jugador se alejó o cambió de habitación)")
-            return
-
-        # Lógica específica para Acid Spitter
-        if self.enemy_type == "acid_spitter" and self.special_attack_cooldown == 0 and 2 <= dist_to_player <= 4:
+            if not self._follow_path(self.patrol_target, current_map, player):
+                self.patrol_target = None # Inalcanzable: elegir otro destino el próximo turno
+
+    def _follow_path(self, goal, current_map, player):
+        """Avanza un paso por el camino A* cacheado hacia goal.
+
+        Solo se replanifica si cambia el destino, la revisión del mapa o el siguiente paso
+        está ocupado. Devuelve False si goal es inalcanzable.
+        """
+        path_is_valid = self.path and self.path_goal == goal and self.path_revision == current_map.revision
+        if path_is_valid and self._is_path_step_free(self.path[0], current_map, player):
+            current_map.path_cache_hits += 1
+        else:
+            path = current_map.find_path((self.x, self.y), goal, blocked=((player.x, player.y),))
+            if path is None:
+                self.path = []
+                return False
+            self.path, self.path_goal, self.path_revision = path, goal, current_map.revision
+
+        if self.path and self._is_path_step_free(self.path[0], current_map, player):
+            next_x, next_y = self.path.pop(0)
+            current_map.occupancy.move("enemy", self, next_x, next_y)
+        return True # Si el paso sigue ocupado (solo había camino por ahí), se espera un turno
+
+    def _is_path_step_free(self, step, current_map, player):
+        return step != (player.x, player.y) and not current_map.occupancy.is_occupied(step[0], step[1], ("enemy",))
+
+    def _lose_track_of_player(self, player):
+        self.state = "alert"
+        self.last_known_player_pos = (player.x, player.y)
+        self.patrol_target = None
+        ai_log.debug("%s cambió a estado: alert (jugador se alejó o cambió de habitación)", self.name)
+
+    def _act_attack(self, player, current_map, all_enemies, dist_to_player):
+        """Acción del estado attack una vez comprobado que sigue viendo al jugador."""
+        ranged_attack = self.archetype.ranged_attack # Ataque a distancia (Acid Spitter)
+        if ranged_attack and self.special_attack_cooldown == 0 and \
+           ranged_attack["min_range"] <= dist_to_player <= ranged_attack["max_range"]:
             # Intenta ataque especial si está en rango y cooldown listo
             self._acid_spit_attack(player, current_map)
-            self.special_attack_cooldown = 3 # Cooldown de 3 turnos para el escupitajo
+            self.special_attack_cooldown = ranged_attack["cooldown"]
+        elif dist_to_player < self.archetype.keep_distance:
+            # Demasiado cerca: retroceder por el mapa de distancias (antes que el cuerpo a cuerpo).
+            # Si está acorralado y el jugador es adyacente, se defiende con el ataque normal
+            moved = self._step_along_flow_field(player, current_map, away=True)
+            if moved is None:
+                moved = self._move_away_from_target((player.x, player.y), current_map, all_enemies, (player.x, player.y))
+            if not moved and dist_to_player <= 1:
+                self.attack_target(player)
         elif dist_to_player <= 1: # Adyacente
             self.attack_target(player) # Ataque normal
-        else: # Perseguir o mantener distancia
-            if self.enemy_type == "acid_spitter" and dist_to_player < 2:
-                # Intenta retroceder si está demasiado cerca
-                self._move_away_from_target((player.x, player.y), current_map, all_enemies, (player.x, player.y))
-            else:
+        elif dist_to_player > self.archetype.keep_distance: # Perseguir por el mapa de distancias al jugador
+            if self._step_along_flow_field(player, current_map) is None: # Demasiado lejos del jugador
                 self._move_towards_target((player.x, player.y), current_map, all_enemies, (player.x, player.y))
+        # A keep_distance justo, espera a que se recargue el ataque a distancia
+
+    def _step_along_flow_field(self, player, current_map, away=False):
+        """Da un paso por el mapa de distancias al jugador: acercándose, o alejándose si away=True.
+
+        Devuelve True si se movió, False si no había paso libre, y None si el enemigo
+        está fuera del mapa de distancias (hay que usar otro tipo de movimiento).
+        """
+        flow_field = current_map.get_player_flow_field(player.x, player.y)
+        best_distance = flow_field.get((self.x, self.y))
+        if best_distance is None:
+            return None
+
+        possible_steps = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+        self.game.rng.ai.shuffle(possible_steps) # Variabilidad entre pasos igual de buenos
+        best_step = None
+        for dx, dy in possible_steps:
+            new_x, new_y = self.x + dx, self.y + dy
+            distance = flow_field.get((new_x, new_y))
+            if distance is None or (new_x == player.x and new_y == player.y):
+                continue
+            improves = distance > best_distance if away else distance < best_distance
+            if improves and not current_map.occupancy.is_occupied(new_x, new_y, ("enemy",)):
+                best_step, best_distance = (new_x, new_y), distance
+
+        if best_step is None:
+            return False
+        current_map.occupancy.move("enemy", self, best_step[0], best_step[1])
+        return True
 
     def _acid_spit_attack(self, player, current_map):
         self.game.current_state.show_message(f"¡{self.name} escupe ácido!")
         # Por ahora, daño directo. Podríamos añadir un proyectil visual más adelante.
-        player.take_damage(self.attack * 0.75) # El ácido hace un poco menos que el ataque base
-        if random.random() < 0.5: # 50% de probabilidad de aplicar corrosión
+        ranged_attack = self.archetype.ranged_attack
+        if player.take_damage(self.attack * ranged_attack["damage_multiplier"]): # El ácido hace un poco menos que el ataque base
+            return # Jugador derrotado: el estado actual ya es game over
+        if self.game.rng.ai.random() < ranged_attack["corrode_chance"]: # Probabilidad de aplicar corrosión
             player.apply_effect("corroded", duration=3, potency=2) # Reduce defensa en 2 por 3 turnos
             self.game.current_state.show_message("¡Tu equipo se CORROE!")
 
@@ -193,39 +286,25 @@ class Enemy:
     def _move_randomly(self, current_map, all_enemies, player_pos_for_collision_check):
         """Movimiento aleatorio simple, similar al 'move' original."""
         possible_moves = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        random.shuffle(possible_moves)
+        self.game.rng.ai.shuffle(possible_moves)
         for dx, dy in possible_moves:
             if self._move_towards_target((self.x + dx, self.y + dy), current_map, all_enemies, player_pos_for_collision_check):
                 break
 
-    def update_ai(self, player, current_map, all_enemies):
-        if not self.is_alive:
-            return
-        
-        if self.special_attack_cooldown > 0:
-            self.special_attack_cooldown -=1
-            
-        if self.state == "idle":
-            self._behavior_idle(player, current_map)
-        elif self.state == "surprised":
-            self._behavior_surprised(player, current_map)
-        elif self.state == "alert":
-            self._behavior_alert(player, current_map, all_enemies)
-        elif self.state == "attack":
-            self._behavior_attack(player, current_map, all_enemies)
-
     def get_rect(self):
         """Devuelve el rectángulo de posición del enemigo en coordenadas del mundo."""
         return pygame.Rect(self.x * TILE_SIZE, self.y * TILE_SIZE, self.width, self.height)
  
-    def draw(self, screen, camera):
-        """Dibuja el enemigo, aplicando el desplazamiento de la cámara."""
+    def draw(self, screen, camera, flashing=False):
+        """Dibuja el enemigo, aplicando el desplazamiento de la cámara (con el tinte
+        "damage_flash" si acaba de recibir un golpe)."""
         enemy_rect_world = self.get_rect()
         enemy_rect_screen = camera.apply(enemy_rect_world)
 
         # Dibuja la imagen del enemigo si está cargada
         if hasattr(self.game, 'enemy_image') and self.image:
-            screen.blit(self.image, enemy_rect_screen)
+            image = self.game.get_image_variant(self.image, "damage_flash") if flashing else self.image
+            screen.blit(image, enemy_rect_screen)
         else: # Si no hay imagen, dibuja un placeholder de color (útil para depuración)
             pygame.draw.rect(screen, RED, enemy_rect_screen) # Define RED en constants.py
         
@@ -238,62 +317,19 @@ class Enemy:
             pygame.draw.rect(screen, GREEN, health_bar_rect)
             
 
-    def load_stats_and_image_by_type(self):        
-        
-        if self.enemy_type == "basic_grunt":
-            self.max_hp = 30
-            self.current_hp = 30
-            self.attack = 8
-            self.defense = 3
-            # Asume que esta imagen ya está cargada en main.py como self.game.enemy_image
-            self.image = self.game.enemy_image # Imagen base del enemigo
-
-        elif self.enemy_type == "heavy_hitter":
-            self.max_hp = 60
-            self.current_hp = 60
-            self.attack = 15
-            self.defense = 5
-            # Necesitarías cargar una imagen específica para este tipo de enemigo en main.py
-            # o tener una imagen más genérica y escalarla/tintarla
-            self.image = self.game.heavy_hitter_image # <-- Necesitarías cargar esta en main.py
-           
-            if not hasattr(self.game, 'heavy_hitter_image') or not self.game.heavy_hitter_image:               
-                self.image = self.game.enemy_image # Fallback si no está cargada
-
-        elif self.enemy_type == "acid_spitter":
-            self.max_hp = 25
-            self.current_hp = 25
-            self.attack = 10 # Su ataque principal es el escupitajo
-            self.defense = 1
-            self.image = self.game.acid_spitter_image # Necesitas cargar esta imagen
-            if not hasattr(self.game, 'acid_spitter_image') or not self.game.acid_spitter_image:
-                self.image = self.game.enemy_image # Fallback
-        
-
-        # Definir qué ítems suelta este tipo de enemigo
-        self.possible_drops = []
-        if self.enemy_type == "basic_grunt":
-            self.possible_drops.append(Consumable(self.game, "Café Turbo", "Te da un subidón de energía.", {"heal": 10}, "assets/items/coffee.png"))
-        elif self.enemy_type == "heavy_hitter":
-            self.possible_drops.append(Weapon(self.game, "Bate con Clavos", "¡Duele mucho!", 10, "assets/items/spiked_bat.png"))
-            self.possible_drops.append(Armor(self.game, "Chaleco de Placas", "Armadura pesada.", 7, "assets/items/plate_vest.png"))
-        elif self.enemy_type == "acid_spitter":
-            self.possible_drops.append(Consumable(self.game, "Antídoto Débil", "Alivia efectos corrosivos.", {"heal": 5}, "assets/items/antidote.png")) # Placeholder de efecto
-
     def die(self):
         self.is_alive = False
         self.game.sound_enemy_death.play()
         self.game.current_state.show_message(f"¡{self.name} Derrotado!")
-        print(f"{self.name} derrotado.")
+        combat_log.debug("%s derrotado.", self.name)
 
         # --- Lógica para soltar un ítem al morir --- <-- ¡NUEVO!
-        if self.possible_drops and random.random() < 0.5: # 50% de probabilidad de soltar algo
-            dropped_item = random.choice(self.possible_drops)
-            dropped_item.x = self.x # El ítem aparece donde murió el enemigo
-            dropped_item.y = self.y
-            self.game.current_state.items_on_map.append(dropped_item)
+        # La tabla de drops del arquetipo solo tiene ids: el ítem se crea si de verdad cae
+        if self.archetype.drops and self.game.rng.loot.random() < 0.5: # 50% de probabilidad de soltar algo
+            item_id = self.game.rng.loot.choice(self.archetype.drops)
+            dropped_item = self.game.current_state.spawn_item(item_id, self.x, self.y) # Donde murió
             self.game.current_state.show_message(f"¡El enemigo soltó un {dropped_item.name}!")
-            print(f"Enemigo soltó {dropped_item.name} en ({self.x}, {self.y}).")
+            combat_log.debug("Enemigo soltó %s en (%d, %d).", dropped_item.name, self.x, self.y)
     
     def _move_away_from_target(self, target_pos, current_map, all_enemies, player_pos_for_collision_check):
         """Intenta moverse un paso alejándose de target_pos."""
@@ -306,7 +342,7 @@ class Enemy:
         if dy_total != 0:
             possible_steps.append((0, 1 if dy_total > 0 else -1))
         
-        random.shuffle(possible_steps)
+        self.game.rng.ai.shuffle(possible_steps)
 
         for dx, dy in possible_steps:
             new_x = self.x + dx
@@ -317,17 +353,16 @@ class Enemy:
             # para solo validar y mover, y la decisión de la dirección vendría de fuera.
             # Por ahora, intentamos movernos a la casilla calculada.
             if self._is_move_valid(new_x, new_y, current_map, all_enemies, player_pos_for_collision_check):
-                self.x = new_x
-                self.y = new_y
+                current_map.occupancy.move("enemy", self, new_x, new_y)
                 return True
         return False
 
     def _is_move_valid(self, new_x, new_y, current_map, all_enemies, player_pos_for_collision_check):
         # Lógica de validación extraída de _move_towards_target
         if not current_map.is_walkable(new_x, new_y): return False
-        if any(obs.x == new_x and obs.y == new_y for obs in current_map.obstacles): return False
+        if current_map.occupancy.is_occupied(new_x, new_y, ("obstacle",)): return False
         if new_x == player_pos_for_collision_check[0] and new_y == player_pos_for_collision_check[1]: return False # No chocar con jugador al huir
-        if any(other.is_alive and other is not self and other.x == new_x and other.y == new_y for other in all_enemies): return False
+        if current_map.occupancy.is_occupied(new_x, new_y, ("enemy",)): return False
         return True
 
 
@@ -0,0 +1,63 @@
+# enemy_archetypes.py
+# Registro compartido de tipos de enemigo ("arquetipos"), cargado una sola vez desde
+# data/enemies.json. Cada Enemy guarda una referencia a su arquetipo en vez de copiar
+# stats, imagen, tabla de drops y parámetros de IA.
+import json
+
+ENEMY_ARCHETYPES_FILE = "data/enemies.json"
+
+
+class EnemyArchetype:
+    """Datos comunes a todos los enemigos de un tipo. Se tratan como de solo lectura."""
+    __slots__ = ("enemy_type", "name", "max_hp", "attack", "defense", "image_key",
+                 "spawn_weight", "drops", "corrode_on_hit_chance", "keep_distance", "ranged_attack")
+
+    def __init__(self, enemy_type, data):
+        self.enemy_type = enemy_type
+        self.name = data.get("name", enemy_type.replace('_', ' ').title()) # Para mensajes
+        self.max_hp = data["max_hp"]
+        self.attack = data["attack"]
+        self.defense = data["defense"]
+        self.image_key = data.get("image", "enemy_image") # Atributo de Game con la imagen
+        self.spawn_weight = data.get("spawn_weight", 0)
+        self.drops = tuple(data.get("drops", ())) # Ids de data/items.json (ver item.create_item)
+
+        ai = data.get("ai", {})
+        self.corrode_on_hit_chance = ai.get("corrode_on_hit_chance", 0) # Corrosión con el ataque normal
+        self.keep_distance = ai.get("keep_distance", 0) # Retrocede si el jugador está más cerca
+        self.ranged_attack = ai.get("ranged_attack") # None si no tiene ataque a distancia
+
+
+_registry = {} # enemy_type -> EnemyArchetype
+
+
+def load_archetypes(path=ENEMY_ARCHETYPES_FILE):
+    """(Re)carga el registro desde el fichero de datos."""
+    with open(path, 'r', encoding="utf-8") as f:
+        data = json.load(f)
+    _registry.clear()
+    for enemy_type, archetype_data in data.items():
+        _registry[enemy_type] = EnemyArchetype(enemy_type, archetype_data)
+    return _registry
+
+
+def get_archetypes():
+    """Registro completo, en el orden del fichero (se carga la primera vez)."""
+    if not _registry:
+        load_archetypes()
+    return _registry
+
+
+def get_archetype(enemy_type):
+    return get_archetypes()[enemy_type]
+
+
+def choose_enemy_type(roll):
+    """Elige un tipo según su spawn_weight a partir de un número aleatorio en [0, 1)."""
+    cumulative = 0
+    archetypes = list(get_archetypes().values())
+    for archetype in archetypes:
+        cumulative += archetype.spawn_weight
+        if roll < cumulative:
+            return archetype.enemy_type
+    return archetypes[-1].enemy_type
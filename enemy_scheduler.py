@@ -0,0 +1,67 @@
+# enemy_scheduler.py
+# Decide qué enemigos hay que procesar cada turno. Los enemigos en "idle" solo pueden
+# despertar si el jugador se acerca a WAKE_DISTANCE tiles, así que se aparcan por zonas
+# del mapa y solo se vuelven a mirar cuando el jugador entra en su zona o en una vecina.
+from enemy_store import STATE_IDLE, WAKE_DISTANCE
+
+# Lado (en tiles) de cada zona. Debe ser mayor que WAKE_DISTANCE: así, si el jugador
+# está a WAKE_DISTANCE o menos de un enemigo, está en la misma zona o en una adyacente.
+WAKE_BAND_SIZE = 8
+
+
+class EnemyScheduler:
+    """Reparte las filas de un EnemyStore entre activas y aparcadas.
+
+    - Activos: cualquier enemigo vivo que no esté en "idle"; se procesan todos los turnos.
+    - Aparcados: enemigos en "idle", agrupados por zona (x // band_size, y // band_size).
+    Un enemigo idle no se mueve ni cambia de estado por sí solo, así que su zona no cambia
+    mientras está aparcado.
+    """
+    def __init__(self, store, band_size=WAKE_BAND_SIZE):
+        assert band_size > WAKE_DISTANCE
+        self.store = store
+        self.band_size = band_size
+        self.active = set() # Índices de fila en el almacén
+        self.parked = {} # (zona_x, zona_y) -> set de índices
+        self.last_turn_count = 0 # Enemigos procesados en el último turno (estadística)
+
+    def _band_of(self, x, y):
+        return x // self.band_size, y // self.band_size
+
+    def add(self, enemy):
+        """Registra un enemigo que ya tiene fila en el almacén."""
+        index = enemy._store_index
+        if enemy.state == "idle":
+            self.parked.setdefault(self._band_of(enemy.x, enemy.y), set()).add(index)
+        else:
+            self.active.add(index)
+
+    def get_turn_indices(self, player):
+        """Índices (ordenados, como el orden de aparición) a procesar este turno."""
+        band_x, band_y = self._band_of(player.x, player.y)
+        indices = set(self.active)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                indices.update(self.parked.get((band_x + dx, band_y + dy), ()))
+        self.last_turn_count = len(indices)
+        return sorted(indices)
+
+    def update_after_turn(self, indices):
+        """Reclasifica los enemigos procesados: los que despertaron pasan a activos y los muertos salen."""
+        states = self.store.columns["state"]
+        alive = self.store.columns["is_alive"]
+        x_column, y_column = self.store.columns["x"], self.store.columns["y"]
+        for index in indices:
+            if index in self.active:
+                if not alive[index]:
+                    self.active.discard(index)
+                continue
+            if alive[index] and states[index] == STATE_IDLE: # Sigue en idle: se queda aparcado
+                continue
+            band = self._band_of(int(x_column[index]), int(y_column[index]))
+            bucket = self.parked[band]
+            bucket.discard(index)
+            if not bucket:
+                del self.parked[band]
+            if alive[index]:
+                self.active.add(index)
@@ -0,0 +1,126 @@
+# enemy_store.py
+# Almacén "structure of arrays" de los enemigos de un nivel: posiciones, vida, stats,
+# cooldowns y estado de IA en arrays de NumPy, para resolver en bloque la parte del
+# turno que no necesita lógica por enemigo.
+import numpy as np
+
+# Códigos de estado de IA (el orden importa: índice en STATE_NAMES)
+STATE_NAMES = ("idle", "surprised", "alert", "attack")
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+STATE_IDLE, STATE_SURPRISED, STATE_ALERT, STATE_ATTACK = range(4)
+
+WAKE_DISTANCE = 2 # idle -> surprised si el jugador está a esta distancia Manhattan o menos
+LOSE_TRACK_DISTANCE = 5 # attack -> alert si el jugador se aleja más (y no comparten habitación)
+
+
+class StoreField:
+    """Atributo de Enemy que vive en un EnemyStore cuando el enemigo pertenece a uno.
+
+    Mientras el enemigo no está en ningún almacén (recién creado), el valor se guarda
+    en el diccionario enemy._unstored; EnemyStore.add lo copia a los arrays y lo libera.
+    """
+    def __init__(self, column):
+        self.column = column
+
+    def __get__(self, enemy, owner=None):
+        if enemy is None:
+            return self
+        store = enemy._store
+        if store is None:
+            return enemy._unstored[self.column]
+        value = store.columns[self.column][enemy._store_index].item()
+        return STATE_NAMES[value] if self.column == "state" else value
+
+    def __set__(self, enemy, value):
+        store = enemy._store
+        if store is None:
+            enemy._unstored[self.column] = value
+        else:
+            store.columns[self.column][enemy._store_index] = STATE_CODES[value] if self.column == "state" else value
+
+
+class EnemyStore:
+    COLUMNS = {
+        "x": np.int32, "y": np.int32,
+        "current_hp": np.float64, "max_hp": np.float64,
+        "attack": np.int32, "defense": np.int32,
+        "special_attack_cooldown": np.int32, "surprise_timer": np.int32,
+        "state": np.int8, "is_alive": np.bool_,
+    }
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.enemies = [] # enemies[i] es el Enemy cuya fila es i
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def add(self, enemy):
+        """Copia los valores del enemigo a una fila nueva y lo convierte en una vista de ella."""
+        if self.count == len(self.columns["x"]):
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate([column, np.zeros_like(column)])
+        index = self.count
+        for name in self.COLUMNS:
+            value = getattr(enemy, name)
+            self.columns[name][index] = STATE_CODES[value] if name == "state" else value
+        enemy._store = self
+        enemy._store_index = index
+        enemy._unstored = None
+        self.enemies.append(enemy)
+        self.count += 1
+
+    def process_turn(self, player, current_map, indices=None):
+        """Turno de IA de los enemigos vivos, en orden de aparición.
+
+        Cooldowns, distancias y cambios de estado (idle->surprised, surprised->attack,
+        attack->alert) se calculan con operaciones sobre los arrays; solo los enemigos que
+        cambian de estado (mensajes) o actúan (alert y attack) ejecutan código Python.
+        `indices` (ordenados) limita el turno a esas filas; por defecto, todas.
+        """
+        if indices is None:
+            indices = np.arange(self.count)
+        else:
+            indices = np.asarray(indices, dtype=np.intp)
+        if len(indices) == 0:
+            return
+        columns = self.columns
+        alive = columns["is_alive"][indices]
+        state = columns["state"][indices] # Estado al empezar el turno (copia)
+
+        cooldown = columns["special_attack_cooldown"]
+        cooling = indices[alive & (cooldown[indices] > 0)]
+        cooldown[cooling] -= 1
+
+        xs, ys = columns["x"][indices], columns["y"][indices]
+        distance = np.abs(xs - player.x) + np.abs(ys - player.y)
+
+        waking = alive & (state == STATE_IDLE) & (distance <= WAKE_DISTANCE)
+
+        surprised = alive & (state == STATE_SURPRISED)
+        surprise_timer = columns["surprise_timer"]
+        surprise_timer[indices[surprised]] -= 1
+        recovering = surprised & (surprise_timer[indices] <= 0)
+
+        attacking = alive & (state == STATE_ATTACK)
+        player_room = current_map.get_room_id_at(player.x, player.y)
+        enemy_rooms = current_map.room_ids[xs, ys]
+        losing_track = attacking & (distance > LOSE_TRACK_DISTANCE) & \
+                       ((enemy_rooms != player_room) | (enemy_rooms < 0) | (player_room < 0))
+
+        alerted = alive & (state == STATE_ALERT)
+        needs_python = waking | recovering | alerted | attacking
+        for position in np.flatnonzero(needs_python).tolist():
+            if player.current_hp <= 0: # Jugador derrotado: el juego ya pasó a game over
+                break
+            enemy = self.enemies[indices[position]]
+            if not enemy.is_alive: # Puede haber muerto antes en este mismo turno
+                continue
+            if waking[position]:
+                enemy._notice_player()
+            elif recovering[position]:
+                enemy._recover_from_surprise()
+            elif alerted[position]:
+                enemy._behavior_alert(player, current_map, self.enemies)
+            elif losing_track[position]:
+                enemy._lose_track_of_player(player)
+            else:
+                enemy._act_attack(player, current_map, self.enemies, int(distance[position]))
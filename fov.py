@@ -0,0 +1,89 @@
+# fov.py
+# Campo de visión por "symmetric shadowcasting" recursivo (8 octantes).
+# Un tile de suelo es visible si su centro queda dentro del cono de luz; las paredes
+# son visibles si cualquier parte de ellas lo está. Esto hace la visión simétrica:
+# si A ve a B, B ve a A.
+import math
+
+# Multiplicadores (xx, xy, yx, yy) que llevan (col, fila) de un octante a (dx, dy) del mapa
+OCTANT_TRANSFORMS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+_octant_tables = {} # radio -> tablas precalculadas
+
+
+def get_octant_tables(radius):
+    """Devuelve (y cachea) las tablas de transformación de octantes para un radio.
+
+    tables[octante][fila][col] = (dx, dy, dentro_del_radio), con 0 <= col <= fila <= radio.
+    """
+    tables = _octant_tables.get(radius)
+    if tables is None:
+        max_dist_sq = (radius + 0.5) ** 2 # Círculo algo más redondo que radius**2
+        tables = []
+        for xx, xy, yx, yy in OCTANT_TRANSFORMS:
+            rows = [()]  # La fila 0 es el propio origen, no se usa
+            for depth in range(1, radius + 1):
+                row = []
+                for col in range(depth + 1):
+                    dx = col * xx + depth * xy
+                    dy = col * yx + depth * yy
+                    row.append((dx, dy, dx * dx + dy * dy <= max_dist_sq))
+                rows.append(tuple(row))
+            tables.append(tuple(rows))
+        tables = tuple(tables)
+        _octant_tables[radius] = tables
+    return tables
+
+
+def compute_fov(tiles, transparent_table, origin_x, origin_y, radius):
+    """Calcula el conjunto de tiles (x, y) visibles desde el origen.
+
+    `tiles` es la matriz uint8 [x, y] de Map y `transparent_table` la tabla de
+    transparencia por tipo de tile (TILE_TRANSPARENT). Solo se lee la ventana del radio alrededor
+    del origen, así que el coste depende del área de visión y no del tamaño del mapa.
+    """
+    width, height = tiles.shape
+    visible = {(origin_x, origin_y)}
+    if radius <= 0:
+        return visible
+
+    # Ventana de transparencias alrededor del jugador (listas de Python: indexado rápido)
+    x0, y0 = max(0, origin_x - radius), max(0, origin_y - radius)
+    x1, y1 = min(width, origin_x + radius + 1), min(height, origin_y + radius + 1)
+    transparent = transparent_table[tiles[x0:x1, y0:y1]].tolist()
+
+    for rows in get_octant_tables(radius):
+        _scan(rows, 1, 0.0, 1.0, origin_x, origin_y, x0, y0, x1, y1, transparent, visible, radius)
+    return visible
+
+
+def _scan(rows, depth, start_slope, end_slope, ox, oy, x0, y0, x1, y1, transparent, visible, radius):
+    """Recorre un octante fila a fila, abriendo una recursión por cada sombra encontrada."""
+    while depth <= radius:
+        row = rows[depth]
+        min_col = math.floor(depth * start_slope + 0.5)
+        max_col = math.ceil(depth * end_slope - 0.5)
+        prev_wall = None
+        for col in range(min_col, max_col + 1):
+            dx, dy, in_radius = row[col]
+            x, y = ox + dx, oy + dy
+            if x0 <= x < x1 and y0 <= y < y1:
+                wall = not transparent[x - x0][y - y0]
+                if in_radius and (wall or depth * start_slope <= col <= depth * end_slope):
+                    visible.add((x, y))
+            else:
+                wall = True # Fuera del mapa bloquea la visión
+
+            if prev_wall and not wall: # Pared -> suelo: la luz empieza en el borde de la pared
+                start_slope = (2 * col - 1) / (2 * depth)
+            elif prev_wall is False and wall: # Suelo -> pared: la fila siguiente termina aquí
+                _scan(rows, depth + 1, start_slope, (2 * col - 1) / (2 * depth),
+                      ox, oy, x0, y0, x1, y1, transparent, visible, radius)
+            prev_wall = wall
+
+        if prev_wall is not False: # La fila acabó en pared (o vacía): no pasa más luz
+            return
+        depth += 1
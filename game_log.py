@@ -0,0 +1,140 @@
+# game_log.py
+# Registro de mensajes del juego sobre el módulo logging, con un logger por subsistema
+# ("ai", "combat", "generation"...) y su propio nivel (config.json: "log_level" y
+# "log_levels") para la consola. Los mensajes se escriben con formateo diferido:
+#
+#     log.debug("%s cambió a estado: %s", enemy.name, state)
+#
+# El nivel de cada logger es el más bajo que alguien quiere ver, así que un mensaje que ni
+# la consola ni el búfer van a usar se descarta en la propia llamada, sin crear el registro.
+# Los que llegan al nivel de captura ("crash_log_level") van a un búfer circular en memoria
+# (sin formatear) con los últimos LOG_RING_SIZE, que se vuelca a CRASH_LOG_FILE si el juego
+# se cae.
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+
+LOG_ROOT = "sbd" # Shattered Biker Dungeon
+LOG_RING_SIZE = 2000
+CRASH_LOG_FILE = "crash.log"
+DEFAULT_LOG_LEVEL = "INFO"
+DEFAULT_CRASH_LOG_LEVEL = "INFO"
+SUBSYSTEMS = ("game", "assets", "generation", "ai", "combat", "player", "items", "replay", "save")
+
+
+class RingBufferHandler(logging.Handler):
+    """Guarda los últimos registros tal cual; solo se formatean al volcarlos."""
+    def __init__(self, capacity=LOG_RING_SIZE):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump(self, stream):
+        for record in list(self.records):
+            stream.write(self.format(record) + "\n")
+
+
+class ConsoleLevelFilter(logging.Filter):
+    """Nivel de la consola: uno general y, si se configura, otro por subsistema."""
+    def __init__(self, level=DEFAULT_LOG_LEVEL):
+        super().__init__()
+        self.level = logging.getLevelName(level)
+        self.levels = {} # Nombre del logger -> nivel
+
+    def filter(self, record):
+        return record.levelno >= self.levels.get(record.name, self.level)
+
+
+root_logger = logging.getLogger(LOG_ROOT)
+root_logger.setLevel(DEFAULT_LOG_LEVEL)
+root_logger.propagate = False # No mezclar con el logging de otras librerías
+
+ring_buffer = RingBufferHandler()
+ring_buffer.setLevel(DEFAULT_CRASH_LOG_LEVEL)
+ring_buffer.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+root_logger.addHandler(ring_buffer)
+
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+console_filter = ConsoleLevelFilter()
+console_handler.addFilter(console_filter)
+root_logger.addHandler(console_handler)
+
+
+def get_logger(subsystem):
+    """Logger de un subsistema (ver SUBSYSTEMS), p. ej. get_logger("ai")."""
+    return logging.getLogger(f"{LOG_ROOT}.{subsystem}")
+
+
+def _level_number(level):
+    levelno = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        raise ValueError(f"Nivel de log desconocido: {level}")
+    return levelno
+
+
+def _update_logger_levels():
+    """Cada logger deja pasar lo que quiere la consola o el búfer, y nada más."""
+    capture = ring_buffer.level
+    root_logger.setLevel(min(console_filter.level, capture))
+    for name, level in console_filter.levels.items():
+        logging.getLogger(name).setLevel(min(level, capture))
+
+
+def set_log_level(level, subsystem=None):
+    """Nivel de consola ("DEBUG", "INFO", "WARNING"...) de un subsistema o, sin subsistema,
+    el general."""
+    levelno = _level_number(level)
+    if subsystem is None:
+        console_filter.level = levelno
+    else:
+        console_filter.levels[get_logger(subsystem).name] = levelno
+    _update_logger_levels()
+
+
+def set_crash_log_level(level):
+    """Nivel a partir del cual los mensajes se guardan en el búfer de CRASH_LOG_FILE."""
+    ring_buffer.setLevel(_level_number(level))
+    _update_logger_levels()
+
+
+def configure_logging(config, log_level=None):
+    """Aplica "log_level" (general, o `log_level` si se da), "log_levels" ({subsistema:
+    nivel}) y "crash_log_level" de config.json."""
+    set_crash_log_level(config.get("crash_log_level", DEFAULT_CRASH_LOG_LEVEL))
+    set_log_level(log_level or config.get("log_level", DEFAULT_LOG_LEVEL))
+    for subsystem, level in config.get("log_levels", {}).items():
+        set_log_level(level, subsystem)
+
+
+def dump_ring_buffer(path=CRASH_LOG_FILE, exc_info=None):
+    """Escribe en `path` los últimos mensajes y, si se da, la excepción que los cerró."""
+    with open(path, 'w', encoding="utf-8") as f:
+        f.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')}: últimos {len(ring_buffer.records)} mensajes ---\n")
+        ring_buffer.dump(f)
+        if exc_info is not None:
+            f.write("--- Excepción ---\n")
+            traceback.print_exception(*exc_info, file=f)
+
+
+def install_crash_handler(path=CRASH_LOG_FILE):
+    """Vuelca el búfer a `path` ante una excepción no capturada (hilo principal u otros)."""
+    previous_excepthook = sys.excepthook
+    previous_thread_excepthook = threading.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        dump_ring_buffer(path, (exc_type, exc, tb))
+        previous_excepthook(exc_type, exc, tb)
+        print(f"Registro del fallo guardado en {path}", file=sys.stderr)
+
+    def thread_excepthook(args):
+        dump_ring_buffer(path, (args.exc_type, args.exc_value, args.exc_traceback))
+        previous_thread_excepthook(args)
+
+    sys.excepthook = excepthook
+    threading.excepthook = thread_excepthook
@@ -0,0 +1,30 @@
+# game_random.py
+# Semilla de la partida y flujos aleatorios separados por uso. Cada flujo es un
+# random.Random propio, así que lo que consume la IA no cambia los niveles ni el botín:
+# con la misma semilla, el nivel N es siempre el mismo.
+import hashlib
+import random
+
+SEED_MASK = 2 ** 64 - 1 # Las semillas se guardan como uint64 (partidas guardadas y repeticiones)
+
+
+def normalize_seed(seed):
+    """Semilla como entero sin signo de 64 bits. Los enteros se recortan a 64 bits; el resto
+    (p. ej. un texto en config.json) se convierte con un hash estable entre ejecuciones."""
+    if isinstance(seed, int) and not isinstance(seed, bool):
+        return seed & SEED_MASK
+    return int.from_bytes(hashlib.blake2b(str(seed).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class GameRandom:
+    """Generadores aleatorios de una partida, derivados de una sola semilla."""
+    def __init__(self, seed=None):
+        self.seed = normalize_seed(seed) if seed is not None else random.randrange(2 ** 32)
+        self.ai = random.Random(f"{self.seed}:ai") # Movimientos, patrullas y ataques de los enemigos
+        self.loot = random.Random(f"{self.seed}:loot") # Drops de los enemigos
+        self.ui = random.Random(f"{self.seed}:ui") # Detalles sin efecto en el juego (mensajes)
+
+    def for_level(self, level_number):
+        """Generador nuevo para generar el nivel `level_number`: depende solo de la semilla
+        y del número de nivel (se puede usar desde el hilo de LevelPregenerator)."""
+        return random.Random(f"{self.seed}:generation:{level_number}")
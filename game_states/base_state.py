@@ -1,9 +1,16 @@
 # game_states/base_state.py
+from game_log import get_logger
+
+log = get_logger("game")
 
 class GameState:
     def __init__(self, game):
         self.game = game # Referencia a la instancia principal del juego
 
+        # --- Redibujado bajo demanda (config "render_on_change") ---
+        self.needs_full_redraw = True # Un estado nuevo siempre se dibuja entero
+        self.dirty_rects = [] # Zonas de pantalla que cambiaron (actualización parcial)
+
     def handle_input(self, event):
         """Maneja los eventos de entrada para este estado."""
         pass
@@ -24,4 +31,23 @@ class GameState:
 
     def exit_state(self):
         """Método llamado cuando se sale de este estado."""
-        pass
\ No newline at end of file
+        pass
+
+    def mark_dirty(self, rect=None):
+        """Indica que hay que redibujar. Sin rect, se actualiza la pantalla entera."""
+        if rect is None:
+            self.needs_full_redraw = True
+        else:
+            self.dirty_rects.append(rect)
+
+    def pop_dirty(self):
+        """Devuelve (redibujado_completo, rects_sucios) y los reinicia."""
+        full_redraw, rects = self.needs_full_redraw, self.dirty_rects
+        self.needs_full_redraw = False
+        self.dirty_rects = []
+        return full_redraw, rects
+
+    def get_wake_delay(self):
+        """Milisegundos hasta que update() tenga algo que hacer sin entrada del jugador
+        (temporizadores). None si el estado puede esperar indefinidamente al siguiente evento."""
+        return None
\ No newline at end of file
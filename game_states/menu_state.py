@@ -1,15 +1,21 @@
 # game_states/menu_state.py
+import os
 import pygame
-from .base_state import GameState
+from .base_state import GameState, log
+from save_game import SAVE_FILE
 from utils.constants import * # Ajusta según tu estructura
 
 class MenuState(GameState):
     def __init__(self, game):
         super().__init__(game)
-        print("Entrando en el estado: Menú Principal")
+        log.info("Entrando en el estado: Menú Principal")
+        self.has_save = os.path.exists(SAVE_FILE) # Partida guardada que se puede continuar
 
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
+            # C continúa la partida guardada, si la hay
+            if event.key == pygame.K_c and self.has_save and self.game.load_saved_game():
+                return
             # Al pulsar cualquier tecla, cambiamos al estado de juego
             # La solicitud de cambio de estado se hace a través del objeto game
             self.game.request_state_change("playing") 
@@ -27,4 +33,8 @@ class MenuState(GameState):
         font_small = pygame.font.Font(None, FONT_DEFAULT_SIZE_SMALL)
         start_text_surface = font_small.render("Pulsa cualquier tecla para empezar", True, GREEN)
         start_text_rect = start_text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
-        screen.blit(start_text_surface, start_text_rect)
\ No newline at end of file
+        screen.blit(start_text_surface, start_text_rect)
+
+        if self.has_save:
+            continue_text_surface = font_small.render("Pulsa C para continuar la partida guardada", True, GREEN)
+            screen.blit(continue_text_surface, continue_text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80)))
\ No newline at end of file
@@ -1,27 +1,42 @@
 # game_states/playing_state.py
 import pygame
-import random
-from .base_state import GameState
+from .base_state import GameState, log
 from objects import Obstacle 
 from utils.constants import *
 from dungeon_generator import Map
 from player import Player
 from camera import Camera
 from enemy import Enemy
+from enemy_store import EnemyStore
+from enemy_scheduler import EnemyScheduler
 from pickup import Pickup
+from item import create_item
+from level_generator import LevelBuilder
+from message_log import MessageLog
 from hub import HUD # Asegúrate que el archivo se llame hud.py
 from motorcycle import Motorcycle
 
 class PlayingState(GameState):
-    def __init__(self, game):
+    def __init__(self, game, snapshot=None):
         super().__init__(game)
-        print("Entrando en el estado: Jugando")
+        log.info("Entrando en el estado: Jugando")
         self.current_level_number = self.game.target_level_number # Usar el nivel objetivo del juego
         self.max_levels = 3  
 
-        self.current_map = Map(self.game, MAP_WIDTH, MAP_HEIGHT)
+        # Nivel ya generado: el de una partida guardada (ver save_game), el que se generó
+        # durante la transición (ver TransitionState) o, si no hay, uno nuevo
+        pregenerated, self.game.pregenerated_level = self.game.pregenerated_level, None
+        if snapshot is None and pregenerated and pregenerated.level_number == self.current_level_number:
+            snapshot = pregenerated.take()
+        if snapshot is None:
+            snapshot = LevelBuilder(self.game, self.current_level_number).build()
+
+        map_width, map_height = snapshot.tiles.shape
+        self.current_map = Map(self.game, map_width, map_height)
         
         self.enemies = [] 
+        self.enemy_store = EnemyStore() # Datos de los enemigos del nivel en arrays (ver process_enemy_turn)
+        self.enemy_scheduler = EnemyScheduler(self.enemy_store) # Aparca a los enemigos idle lejanos
         self.pickups = []
         self.items_on_map = []       
        
@@ -32,9 +47,8 @@ class PlayingState(GameState):
         self.player = self.game.persistent_player
         self.motorcycle = self.game.persistent_motorcycle
 
-        self.message = ""
-        self.message_timer = 0
-        self.message_duration = 2000
+        self.message_log = MessageLog(self.game.font_message) # Últimos mensajes, ya renderizados
+        self.damage_flashes = {} # Jugador o enemigo recién golpeado -> ms que le quedan al destello
 
         self.hud = HUD(self.game, self.player, self.motorcycle)
         
@@ -43,43 +57,50 @@ class PlayingState(GameState):
         # ya que _initialize_level() llama a self.camera.update()
         self.camera = Camera(self.player, self.current_map.width, self.current_map.height)
 
-        # Ahora inicializar el nivel
-        self._initialize_level()
-        
-        # Colocar obstáculos y pickups después de que el nivel y el jugador estén listos
-        self.place_obstacles() 
-        self.place_pickups() 
-        
-        # La cámara ya se actualizó en _initialize_level después de posicionar al jugador
-        self.camera.update()
+        self._initialize_level(snapshot)
              
         self.awaiting_powerful_attack_target = False
+        self.turn_count = 0 # Turnos resueltos en este nivel (ver process_enemy_turn)
 
-    def _initialize_level(self):
+    def _initialize_level(self, snapshot):
+        """Adopta un nivel generado (LevelSnapshot): mapa, enemigos, ítems, obstáculos y pickups."""
         self.show_message(f"Nivel {self.current_level_number}")
                 
         self.enemies = []
+        self.enemy_store = EnemyStore()
+        self.enemy_scheduler = EnemyScheduler(self.enemy_store)
         self.pickups = []
         self.items_on_map = []
         
-        self.current_map.generate_dungeon(self)
-        self.player.x = self.current_map.player_start_pos[0]
-        self.player.y = self.current_map.player_start_pos[1]
+        current_map = self.current_map
+        current_map.load_snapshot(snapshot)
+        for enemy_type, x, y, state, room_id in snapshot.enemies:
+            enemy = Enemy(self.game, x, y, enemy_type, room_rect=current_map.room_rects[room_id] if room_id >= 0 else None)
+            enemy.state = state
+            self.spawn_enemy(enemy)
+        for item_id, x, y in snapshot.items:
+            self.spawn_item(item_id, x, y)
+        for x, y in snapshot.obstacles:
+            obstacle = Obstacle(self.game, x, y)
+            current_map.obstacles.append(obstacle)
+            current_map.occupancy.add("obstacle", obstacle)
+        current_map.bump_revision() # Los obstáculos bloquean el paso: rejilla y caminos cacheados ya no valen
+        for pickup_type, x, y in snapshot.pickups:
+            pickup = Pickup(self.game, x, y, pickup_type)
+            self.pickups.append(pickup)
+            current_map.occupancy.add("pickup", pickup)
+
+        self.player.x = current_map.player_start_pos[0]
+        self.player.y = current_map.player_start_pos[1]
 
         # Calcular FOV inicial
-        self.current_map.update_fov(self.player.x, self.player.y)
+        current_map.update_fov(self.player.x, self.player.y)
         # Actualizar la cámara para que se centre en la nueva posición del jugador
         self.camera.update() 
-        
-        # Es importante que place_obstacles y place_pickups se llamen DESPUÉS
-        # de que el mapa y sus contenidos (enemigos/items de habitaciones) se hayan generado
-        # para evitar solapamientos o limpiar contenido recién creado.
-        # Si estas funciones deben ejecutarse por nivel, este es un buen lugar.
-        # self.place_obstacles() # Movido a __init__ para que se ejecute una vez por estado PlayingState
-        # self.place_pickups()   # o aquí si es específico del nivel y necesita el mapa generado.
 
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
+            self.mark_dirty() # Cualquier tecla puede mover, atacar o tocar el inventario
             if event.key == pygame.K_i:
                 self.player.inventory.toggle_open()
                 return
@@ -113,11 +134,8 @@ class PlayingState(GameState):
                 target_x = self.player.x + dx
                 target_y = self.player.y + dy
 
-                target_enemy = None
-                for enemy in self.enemies:
-                    if enemy.x == target_x and enemy.y == target_y and enemy.is_alive:
-                        target_enemy = enemy
-                        break
+                occupancy = self.current_map.occupancy
+                target_enemy = occupancy.get("enemy", target_x, target_y) # Solo contiene enemigos vivos
 
                 player_action_taken = False
 
@@ -130,18 +148,20 @@ class PlayingState(GameState):
                         enemy_defeated = self.player.attack_target(target_enemy)
                     
                     if enemy_defeated:
+                        occupancy.remove("enemy", target_enemy)
+                        target_enemy.die() # Sonido, mensaje y, quizá, botín
                         self.enemies = [e for e in self.enemies if e.is_alive]
-                        print(f"Enemigo derrotado. Quedan {len(self.enemies)} enemigos.")
+                        log.debug("Enemigo derrotado. Quedan %d enemigos.", len(self.enemies))
                         
                 else:
-                    collides_with_obstacle = any(obs.x == target_x and obs.y == target_y for obs in self.current_map.obstacles)
+                    collides_with_obstacle = occupancy.is_occupied(target_x, target_y, ("obstacle",))
                     
                     if collides_with_obstacle:
                         player_action_taken = True
-                        print("Colisión con obstáculo, el jugador no se mueve.")
+                        log.debug("Colisión con obstáculo, el jugador no se mueve.")
                     elif not self.current_map.is_walkable(target_x, target_y):
                         player_action_taken = True
-                        print("Tile no caminable, el jugador no se mueve.")
+                        log.debug("Tile no caminable, el jugador no se mueve.")
                     else:
                         if self.awaiting_powerful_attack_target:
                             self.awaiting_powerful_attack_target = False
@@ -156,44 +176,60 @@ class PlayingState(GameState):
                                 if self.motorcycle.fuel_current <= 0:
                                     self.show_message("¡TE HAS QUEDADO SIN COMBUSTIBLE!")
                                     self.game.request_state_change("game_over")
+                                    return # La partida acabó: no recoger nada ni resolver el turno
 
-                            for pickup in self.pickups:
-                                if not pickup.is_collected and \
-                                   self.player.x == pickup.x and self.player.y == pickup.y:
-                                    pickup.collect(self.player)
-                                    break
+                            pickup = occupancy.get("pickup", self.player.x, self.player.y)
+                            if pickup:
+                                pickup.collect(self.player)
+                                occupancy.remove("pickup", pickup)
                             
-                            items_to_remove = []
-                            for item_on_map in self.items_on_map:
-                                if self.player.x == item_on_map.x and self.player.y == item_on_map.y:
-                                    if self.player.inventory.add_item(item_on_map):
-                                        items_to_remove.append(item_on_map)
-                                        self.game.sound_pickup.play()
-                                    break
-
-                            for item_to_remove in items_to_remove:
-                                self.items_on_map.remove(item_to_remove)
+                            item_on_map = occupancy.get("item", self.player.x, self.player.y)
+                            if item_on_map and self.player.inventory.add_item(item_on_map):
+                                occupancy.remove("item", item_on_map)
+                                self.items_on_map.remove(item_on_map)
+                                self.game.sound_pickup.play()
 
                             # Actualizar FOV después de moverse
                             self.current_map.update_fov(self.player.x, self.player.y)
 
-                if player_action_taken:
+                # Si la partida acabó en este turno (sin combustible, jugador derrotado) el estado
+                # actual ya es otro: no seguir resolviendo el turno sobre este
+                if player_action_taken and self.game.current_state is self:
                     self.process_enemy_turn()
-                    self.player.end_turn_update() 
+                    if self.game.current_state is self:
+                        self.player.end_turn_update() 
                    
             if event.key == pygame.K_p:
                 pass
 
+    def spawn_item(self, item_id, x, y):
+        """Crea un ítem de data/items.json en el suelo del nivel."""
+        item = create_item(self.game, item_id)
+        item.x = x
+        item.y = y
+        self.items_on_map.append(item)
+        self.current_map.occupancy.add("item", item)
+        return item
+
+    def spawn_enemy(self, enemy):
+        """Añade un enemigo al nivel (lista, índice de ocupación, almacén de arrays y planificador)."""
+        self.enemies.append(enemy)
+        self.enemy_store.add(enemy)
+        self.enemy_scheduler.add(enemy)
+        self.current_map.occupancy.add("enemy", enemy)
+
     def process_enemy_turn(self):
-        enemies_to_process = list(self.enemies)
-        for enemy in enemies_to_process:
-            if enemy.is_alive:
-               enemy.update_ai(self.player, self.current_map, self.enemies)
+        self.turn_count += 1
+        # La IA de todos los enemigos se resuelve en bloque sobre arrays (ver EnemyStore).
+        # Los enemigos idle lejos del jugador ni se miran (ver EnemyScheduler).
+        turn_indices = self.enemy_scheduler.get_turn_indices(self.player)
+        self.enemy_store.process_turn(self.player, self.current_map, turn_indices)
+        self.enemy_scheduler.update_after_turn(turn_indices)
 
         self.camera.update()
 
         if self.player.x == self.current_map.exit_pos[0] and self.player.y == self.current_map.exit_pos[1]:
-            print("¡Has llegado a la salida! -->", self.current_level_number, ">=", self.max_levels)
+            log.info("¡Has llegado a la salida! (nivel %d de %d)", self.current_level_number, self.max_levels)
             if self.current_level_number >= self.max_levels:
                 self.show_message("¡Has completado todas las misiones! ¡VICTORIA!")
                 self.game.request_state_change("victory")
@@ -203,37 +239,56 @@ class PlayingState(GameState):
                 self.game.request_state_change("transition")
             return
         
+    @property
+    def message(self):
+        """Último mensaje visible ("" si no hay)."""
+        return self.message_log.latest
+
     def update(self, dt):
-        if self.message_timer > 0:
-            self.message_timer -= (dt * 1000)
-            if self.message_timer <= 0:
-                self.message = ""
+        if self.message_log.update(dt * 1000) and self.message_log.rect:
+            self.mark_dirty(self.message_log.rect) # Solo hay que borrar los mensajes
+        if self.damage_flashes:
+            for entity in list(self.damage_flashes):
+                self.damage_flashes[entity] -= dt * 1000
+                if self.damage_flashes[entity] <= 0:
+                    del self.damage_flashes[entity]
+                    self.mark_dirty(self.camera.apply(entity.get_rect())) # Volver a la imagen normal
+
+    def get_wake_delay(self):
+        delays = [delay for delay in (self.message_log.get_wake_delay(), min(self.damage_flashes.values(), default=None))
+                  if delay is not None]
+        return min(delays, default=None)
+
+    def flash_damage(self, entity):
+        """Dibuja `entity` (jugador o enemigo) con el tinte "damage_flash" durante DAMAGE_FLASH_DURATION."""
+        self.damage_flashes[entity] = DAMAGE_FLASH_DURATION
+        self.mark_dirty()
 
     def draw(self, screen):
         screen.fill(BLACK)
         self.current_map.draw(screen, self.camera)
-        self.player.draw(screen, self.camera)
+        self.player.draw(screen, self.camera, self.player in self.damage_flashes)
 
         for enemy in self.enemies:
             if enemy.is_alive:
                 # Solo dibujar si el enemigo está en un tile visible
                 if self.game.config.get("fov_enabled", True):
-                    if self.current_map.visibility_map[enemy.x][enemy.y] == 2: # VISIBLE
-                        enemy.draw(screen, self.camera)
+                    if self.current_map.visibility_map[enemy.x, enemy.y] == 2: # VISIBLE
+                        enemy.draw(screen, self.camera, enemy in self.damage_flashes)
                 else: # FOV desactivado, dibujar siempre
-                    enemy.draw(screen, self.camera)
+                    enemy.draw(screen, self.camera, enemy in self.damage_flashes)
 
         
         for pickup in self.pickups:
             if self.game.config.get("fov_enabled", True):
-                if self.current_map.visibility_map[pickup.x][pickup.y] == 2: # VISIBLE
+                if self.current_map.visibility_map[pickup.x, pickup.y] == 2: # VISIBLE
                     pickup.draw(screen, self.camera)
             else:
                 pickup.draw(screen, self.camera)
 
         for item_on_map in self.items_on_map:
             if self.game.config.get("fov_enabled", True):
-                if self.current_map.visibility_map[item_on_map.x][item_on_map.y] == 2: # VISIBLE
+                if self.current_map.visibility_map[item_on_map.x, item_on_map.y] == 2: # VISIBLE
                     item_on_map_rect_world = pygame.Rect(item_on_map.x * TILE_SIZE, item_on_map.y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
                     screen.blit(item_on_map.image, self.camera.apply(item_on_map_rect_world))
             else:
@@ -242,81 +297,10 @@ class PlayingState(GameState):
 
         self.hud.draw(screen)      
 
-        if self.message:
-            message_font = pygame.font.Font(None, 36)
-            message_surface = message_font.render(self.message, True, YELLOW)
-            message_rect = message_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-            screen.blit(message_surface, message_rect)
+        self.message_log.draw(screen)
                 
         self.player.inventory.draw(screen)
         
     def show_message(self, text):
-        self.message = text
-        self.message_timer = self.message_duration
-
-    def place_obstacles(self):
-        self.current_map.obstacles = []
-        valid_obstacle_tiles = []
-        
-        for room_rect in self.current_map.room_rects:
-            for x_coord in range(room_rect.left, room_rect.right):
-                for y_coord in range(room_rect.top, room_rect.bottom):
-                    if self.current_map.is_walkable(x_coord, y_coord) and \
-                       (x_coord, y_coord) != self.current_map.player_start_pos and \
-                       (x_coord, y_coord) != self.current_map.exit_pos: 
-                        valid_obstacle_tiles.append((x_coord, y_coord))
-
-        random.shuffle(valid_obstacle_tiles)
-        num_obstacles_to_add = random.randint(3, 7)
-        
-        placed_count = 0
-        for ox, oy in valid_obstacle_tiles:
-            if placed_count >= num_obstacles_to_add:
-                break
-            
-            is_occupied = any(enemy.x == ox and enemy.y == oy for enemy in self.enemies) or \
-                          any(item.x == ox and item.y == oy for item in self.items_on_map) or \
-                          any(pickup.x == ox and pickup.y == oy for pickup in self.pickups)
-
-            if not is_occupied:
-                self.current_map.obstacles.append(Obstacle(self.game, ox, oy))
-                placed_count +=1
-        
-        print(f"Colocados {len(self.current_map.obstacles)} obstáculos.")
-
-    def place_pickups(self):
-        self.pickups = []
-        valid_spawn_tiles = []
-
-        # Iterar solo sobre los tiles dentro de las habitaciones
-        for room_rect in self.current_map.room_rects:
-            # No generar pickups en la habitación inicial (donde empieza el jugador)
-            if room_rect.level == 0: # Asumiendo que la habitación inicial tiene level 0
-                continue
-
-            for x_coord in range(room_rect.left, room_rect.right):
-                for y_coord in range(room_rect.top, room_rect.bottom):
-                    # Asegurarse de que no sea la posición de inicio del jugador ni la salida, y que sea caminable
-                    if self.current_map.is_walkable(x_coord, y_coord) and \
-                       (x_coord, y_coord) != self.current_map.player_start_pos and \
-                       (x_coord, y_coord) != self.current_map.exit_pos:
-                        
-                        is_occupied = any(obs.x == x_coord and obs.y == y_coord for obs in self.current_map.obstacles) or \
-                                      any(enemy.x == x_coord and enemy.y == y_coord for enemy in self.enemies) or \
-                                      any(item.x == x_coord and item.y == y_coord for item in self.items_on_map)
-
-
-                    if not is_occupied:
-                        valid_spawn_tiles.append((x_coord, y_coord))
-
-        random.shuffle(valid_spawn_tiles)
-        num_pickups_to_add = 2 
-
-        placed_count = 0
-        for px, py in valid_spawn_tiles:
-            if placed_count >= num_pickups_to_add:
-                break
-            self.pickups.append(Pickup(self.game, px, py, "health_potion"))
-            placed_count += 1
-
-        print(f"Colocados {len(self.pickups)} pickups.")
\ No newline at end of file
+        self.message_log.post(text)
+        self.mark_dirty()
@@ -1,17 +1,17 @@
 # game_states/transition_state.py
 import pygame
-import random
-from .base_state import GameState
+from .base_state import GameState, log
+from level_generator import LevelPregenerator
 from utils.constants import *
 
 class TransitionState(GameState):
     def __init__(self, game, next_level_number):
         super().__init__(game)
         self.next_level_number = next_level_number
-        print(f"Entrando en el estado: Transición al Nivel {self.next_level_number}")
+        log.info("Entrando en el estado: Transición al Nivel %d", self.next_level_number)
 
         self.messages = ["¡Gaaas!", "¡Curveando!", "¡Dándole al puño!", "¡A por el siguiente tramo!", "¡Quemando rueda!"]
-        self.display_message = random.choice(self.messages)
+        self.display_message = self.game.rng.ui.choice(self.messages)
 
         self.font_large = pygame.font.Font(None, FONT_DEFAULT_SIZE_LARGE) # O la fuente que prefieras
         self.font_small = pygame.font.Font(None, FONT_DEFAULT_SIZE_SMALL)
@@ -20,11 +20,15 @@ class TransitionState(GameState):
         try:
             self.transition_image = self.game.transition_screen_image # Cargada en Game.load_assets()
         except AttributeError:
-            print("Advertencia: Imagen de transición no cargada. Usando fondo de color.")
+            log.warning("Imagen de transición no cargada. Usando fondo de color.")
             self.transition_image = None
 
         self.timer = 3000 # Milisegundos (3 segundos)
 
+        # Mientras dura la transición, el siguiente nivel se genera en otro hilo;
+        # PlayingState lo adopta ya hecho al entrar
+        self.game.pregenerated_level = LevelPregenerator(self.game, self.next_level_number)
+
     def update(self, dt):
         self.timer -= (dt * 1000)
         if self.timer <= 0:
@@ -33,6 +37,9 @@ class TransitionState(GameState):
             # Por ahora, PlayingState ya incrementa su propio current_level_number.
             self.game.request_state_change("playing")
 
+    def get_wake_delay(self):
+        return max(0, self.timer)
+
     def draw(self, screen):
         if self.transition_image:
             screen.blit(self.transition_image, (0,0))
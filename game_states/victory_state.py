@@ -1,23 +1,19 @@
 # game_states/victory_state.py
 import pygame
-from .base_state import GameState
+from .base_state import GameState, log
 from utils.constants import * # Cambio a importación absoluta
 
 class VictoryState(GameState):
     def __init__(self, game):
         super().__init__(game)
-        print("Entrando en el estado: ¡Victoria!")
+        log.info("Entrando en el estado: ¡Victoria!")
         self.font = pygame.font.Font(None, 48) # FONT_DEFAULT_SIZE_MEDIUM
         self.small_font = pygame.font.Font(None, 24) # FONT_DEFAULT_SIZE_SMALL
 
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_r:
-                if hasattr(self.game, 'persistent_player'):
-                    del self.game.persistent_player
-                if hasattr(self.game, 'persistent_motorcycle'):
-                    del self.game.persistent_motorcycle
-                self.game.target_level_number = 1 # Resetear al nivel 1 al reiniciar
+                self.game.new_run() # Jugador nuevo, nivel 1 y semilla nueva (o la de config.json)
                 self.game.request_state_change("playing")
             elif event.key == pygame.K_ESCAPE:
                 self.game.running = False
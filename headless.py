@@ -0,0 +1,111 @@
+# headless.py
+# Juego sin ventana ni audio, manejado desde código: inyectar teclas, avanzar turnos y
+# consultar el estado. Sirve para medir turnos por segundo y para pruebas de carga.
+#
+# Uso: python headless.py [--turns 1000] [--render] [--seed 1] [--record]
+import argparse
+import random
+import time
+
+import pygame
+from game_states import PlayingState, TransitionState
+from main import Game
+from utils.constants import *
+
+MOVE_KEYS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT)
+
+
+class HeadlessGame:
+    """Envuelve un Game(headless=True). Con render=False no se dibuja nada."""
+    def __init__(self, render=False, seed=None, record_replays=False, log_level=None):
+        self.game = Game(headless=True, seed=seed, record_replays=record_replays, log_level=log_level)
+        self.render = render
+
+    @property
+    def state(self):
+        return self.game.current_state
+
+    def new_game(self, seed=None):
+        """Empieza una partida nueva desde el nivel 1 (como 'R' en game over)."""
+        self.game.new_run(seed)
+        self.game.request_state_change("playing")
+
+    def press_key(self, key, dt=1.0 / FPS):
+        """Inyecta una pulsación de tecla y avanza un frame."""
+        event = pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+        self.game.step([event], dt=dt, render=self.render)
+
+    def advance(self, ms):
+        """Deja pasar `ms` milisegundos de juego en un solo frame (mensajes, transiciones)."""
+        self.game.step(dt=ms / 1000.0, render=self.render)
+
+    def step_turns(self, n, choose_key=None, skip_transitions=True):
+        """Pulsa teclas hasta resolver `n` turnos o hasta que la partida acabe.
+
+        `choose_key(headless_game)` elige cada tecla (por defecto, un movimiento al azar).
+        Las pantallas de transición se saltan en el acto si skip_transitions.
+        Devuelve el número de turnos resueltos.
+        """
+        choose_key = choose_key or (lambda _: random.choice(MOVE_KEYS))
+        turns = 0
+        while turns < n and self.game.running:
+            if skip_transitions and isinstance(self.state, TransitionState):
+                self.advance(self.state.timer + 1)
+                continue
+            if not isinstance(self.state, PlayingState):
+                break # Menú, game over o victoria
+            state = self.state
+            turns_before = state.turn_count
+            self.press_key(choose_key(self))
+            turns += state.turn_count - turns_before
+        return turns
+
+    def get_state(self):
+        """Resumen del estado actual en datos planos."""
+        state = self.state
+        summary = {"state": type(state).__name__, "running": self.game.running}
+        if isinstance(state, PlayingState):
+            player = state.player
+            summary.update({
+                "level": state.current_level_number,
+                "turn": state.turn_count,
+                "player": {"x": player.x, "y": player.y, "hp": player.current_hp, "max_hp": player.max_hp},
+                "fuel": state.motorcycle.fuel_current if state.motorcycle else None,
+                "enemies_alive": sum(1 for enemy in state.enemies if enemy.is_alive),
+                "items_on_map": len(state.items_on_map),
+                "message": state.message,
+            })
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación headless: turnos por segundo")
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--render", action="store_true", help="Dibujar cada frame (en una pantalla virtual)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--record", action="store_true", help="Grabar cada partida en replays/ (ver replay.py)")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de log del juego (DEBUG, INFO, WARNING...)")
+    args = parser.parse_args()
+
+    random.seed(args.seed) # Las teclas al azar de step_turns
+    headless = HeadlessGame(render=args.render, seed=args.seed, record_replays=args.record,
+                            log_level=args.log_level)
+    turns = 0
+    games = 0
+    start = time.perf_counter()
+    while turns < args.turns:
+        headless.new_game(args.seed + games) # Cada partida con su semilla, reproducible
+        games += 1
+        played = headless.step_turns(args.turns - turns)
+        turns += played
+        if played == 0:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"{turns} turnos en {elapsed:.2f} s: {turns / elapsed:.0f} turnos/s (render={'sí' if args.render else 'no'})")
+    print(headless.get_state())
+    if headless.game.replay_recorder:
+        headless.game.replay_recorder.close()
+
+
+if __name__ == "__main__":
+    main()
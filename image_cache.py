@@ -0,0 +1,86 @@
+# image_cache.py
+# Caché de imágenes compartida por todo el proceso: cada (ruta, tamaño) se lee del disco
+# y se escala una sola vez. Las Surface devueltas son compartidas: no hay que modificarlas.
+from collections import OrderedDict
+
+import pygame
+from game_log import get_logger
+from utils.constants import *
+
+log = get_logger("assets")
+
+IMAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024 # Límite aproximado de memoria de píxeles
+
+
+class ImageCache:
+    """LRU de Surface con clave (ruta, tamaño), limitada por bytes de píxeles.
+
+    Si una imagen no se puede cargar se devuelve un placeholder de color (también
+    cacheado), igual que hacían los constructores de ítems.
+    """
+    def __init__(self, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict() # clave -> Surface, de la menos a la más usada
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, path, size=(TILE_SIZE, TILE_SIZE), placeholder_color=PURPLE):
+        """Imagen de `path` escalada a `size` (None = tamaño original), con canal alfa."""
+        key = (path, tuple(size) if size else None)
+        image = self._get(key)
+        if image is None:
+            try:
+                image = pygame.image.load(path).convert_alpha()
+                if size and image.get_size() != key[1]: # Escalar si es necesario
+                    image = pygame.transform.scale(image, key[1])
+            except (pygame.error, FileNotFoundError):
+                log.warning("Error cargando imagen %s. Usando placeholder.", path)
+                image = self.get_placeholder(size or (TILE_SIZE, TILE_SIZE), placeholder_color)
+            self._put(key, image)
+        return image
+
+    def get_placeholder(self, size=(TILE_SIZE, TILE_SIZE), color=PURPLE):
+        """Cuadrado de color liso para imágenes que faltan."""
+        key = (None, tuple(size), tuple(color))
+        image = self._get(key)
+        if image is None:
+            image = pygame.Surface(key[1])
+            image.fill(color)
+            self._put(key, image)
+        return image
+
+    def get_stats(self):
+        return {"entries": len(self.surfaces), "bytes": self.total_bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self):
+        self.surfaces.clear()
+        self.total_bytes = 0
+
+    def _get(self, key):
+        image = self.surfaces.get(key)
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+        return image
+
+    def _put(self, key, image):
+        self.surfaces[key] = image
+        self.total_bytes += self._size_in_bytes(image)
+        # Expulsar las menos usadas; la recién añadida se queda aunque sola supere el límite
+        while self.total_bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.total_bytes -= self._size_in_bytes(evicted)
+            self.evictions += 1
+
+    @staticmethod
+    def _size_in_bytes(image):
+        width, height = image.get_size()
+        return width * height * image.get_bytesize()
+
+
+image_cache = ImageCache() # Instancia compartida por todo el juego
@@ -1,7 +1,10 @@
 # inventory.py
 import pygame
+from game_log import get_logger
 from utils.constants import *
 
+log = get_logger("items")
+
 class Inventory:
     def __init__(self, game, owner, capacity=8):
         self.game = game
@@ -72,7 +75,7 @@ class Inventory:
             self.equipped_armor = item
             self.owner.defense = self.owner.base_defense + item.defense_bonus
             self.game.current_state.show_message(f"Equipaste: {item.name} (+{item.defense_bonus} defensa)")
-        print(f"Jugador equipó {item.name}. Stats actualizados.")
+        log.debug("Jugador equipó %s. Stats actualizados.", item.name)
 
     def _unequip_item(self, item_type):
         if item_type == "weapon" and self.equipped_weapon:
@@ -83,7 +86,7 @@ class Inventory:
             self.game.current_state.show_message(f"Desequipaste: {self.equipped_armor.name}")
             self.owner.defense = self.owner.base_defense
             self.equipped_armor = None
-        print(f"Jugador desequipó {item_type}. Stats restaurados a base.")
+        log.debug("Jugador desequipó %s. Stats restaurados a base.", item_type)
 
     def use_selected_item(self):
         item = self.get_selected_item()
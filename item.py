@@ -1,7 +1,12 @@
 # item.py
+import json
 import pygame
+from game_log import get_logger
+from image_cache import image_cache
 from utils.constants import *
 
+log = get_logger("items")
+
 class Item:
     def __init__(self, game, name, description, item_type, image_path):
         self.game = game
@@ -9,19 +14,12 @@ class Item:
         self.description = description
         self.item_type = item_type # Ej: "weapon", "armor", "consumable"
 
-        self.image = None
-        try:
-            self.image = pygame.image.load(image_path).convert_alpha()
-            if self.image.get_width() != TILE_SIZE: # Escalar si es necesario
-                self.image = pygame.transform.scale(self.image, (TILE_SIZE, TILE_SIZE))
-        except pygame.error:
-            print(f"Error cargando imagen para ítem {name} en {image_path}. Usando placeholder.")
-            self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            self.image.fill(PURPLE) # Un color de placeholder
+        # Imagen compartida con el resto de ítems que usan la misma (ver image_cache)
+        self.image = image_cache.load(image_path, (TILE_SIZE, TILE_SIZE), placeholder_color=PURPLE)
 
     def use(self, player, motorcycle=None):
         """Método placeholder. Las subclases implementarán su propia lógica."""
-        print(f"Usando {self.name}...")
+        log.debug("Usando %s...", self.name)
         self.game.current_state.show_message(f"Usas el {self.name}!")
         return False # Retorna False si el uso no consume el turno
 
@@ -51,20 +49,49 @@ class Consumable(Item):
             heal_amount = self.effect["heal"]
             player.current_hp = min(player.max_hp, player.current_hp + heal_amount)
             self.game.current_state.show_message(f"¡Te curas {heal_amount} HP!")
-            print(f"Jugador se curó. HP: {player.current_hp}/{player.max_hp}")
+            log.debug("Jugador se curó. HP: %s/%s", player.current_hp, player.max_hp)
             self.game.sound_pickup.play() # Reusar el sonido de pickup para curar
 
         elif self.effect.get("refuel") and motorcycle: # Comprobar que motorcycle no sea None
             refuel_amount = self.effect["refuel"]
             motorcycle.refuel(refuel_amount)
             self.game.current_state.show_message(f"¡Moto reabastecida +{refuel_amount} comb.!")
-            print(f"Moto reabastecida. Combustible: {motorcycle.fuel_current}/{motorcycle.fuel_max}")
+            log.debug("Moto reabastecida. Combustible: %s/%s", motorcycle.fuel_current, motorcycle.fuel_max)
             # Podrías añadir un sonido específico para reabastecer
 
         elif self.effect.get("repair_moto") and motorcycle: # Comprobar que motorcycle no sea None
             repair_amount = self.effect["repair_moto"]
             motorcycle.repair(repair_amount)
             self.game.current_state.show_message(f"¡Moto reparada +{repair_amount} comb.!")
-            print(f"Moto reaprada. Estado: {motorcycle.current_hp}/{motorcycle.max_hp}")
+            log.debug("Moto reaprada. Estado: %s/%s", motorcycle.current_hp, motorcycle.max_hp)
+
+        return True # El uso de un consumible generalmente consume el turno
+
+ITEMS_FILE = "data/items.json"
+_item_definitions = {} # id -> definición (prototipo ligero: datos, sin imagen)
+
+
+def get_item_definitions():
+    """Definiciones de ítems por id, cargadas de ITEMS_FILE la primera vez."""
+    if not _item_definitions:
+        with open(ITEMS_FILE, 'r', encoding="utf-8") as f:
+            _item_definitions.update(json.load(f))
+    return _item_definitions
+
 
-        return True # El uso de un consumible generalmente consume el turno
\ No newline at end of file
+def create_item(game, item_id):
+    """Crea el ítem `item_id` a partir de su definición en data/items.json (p. ej. "wrench").
+    Solo aquí se carga su imagen, así que conviene llamarlo cuando el ítem va a aparecer de
+    verdad (al soltarlo o colocarlo), no antes."""
+    definition = get_item_definitions()[item_id]
+    item_type = definition["type"]
+    if item_type == "weapon":
+        item = Weapon(game, definition["name"], definition["description"], definition["damage_bonus"], definition["image"])
+    elif item_type == "armor":
+        item = Armor(game, definition["name"], definition["description"], definition["defense_bonus"], definition["image"])
+    elif item_type == "consumable":
+        item = Consumable(game, definition["name"], definition["description"], dict(definition["effect"]), definition["image"])
+    else:
+        raise ValueError(f"Tipo de ítem desconocido: {item_type}")
+    item.item_id = item_id # Para guardar la partida (ver save_game)
+    return item
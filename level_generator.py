@@ -0,0 +1,145 @@
+# level_generator.py
+# Generación de niveles como datos. LevelBuilder ejecuta la generación completa (mazmorra,
+# contenido de las habitaciones, obstáculos y pickups) sobre un Map propio y devuelve un
+# LevelSnapshot: solo números, tuplas y arrays, sin Surfaces ni referencias al estado del
+# juego. PlayingState lo adopta (ver PlayingState._initialize_level). Como no toca nada
+# compartido, LevelPregenerator puede generar el siguiente nivel en un hilo durante la
+# pantalla de transición.
+import threading
+
+from dungeon_generator import Map
+from game_log import get_logger
+from utils.constants import *
+
+
+log = get_logger("generation")
+
+
+class LevelSnapshot:
+    """Un nivel generado, en datos planos."""
+    __slots__ = ("level_number", "tiles", "rooms", "player_start_pos", "exit_pos",
+                 "enemies", "items", "obstacles", "pickups")
+
+    def __init__(self, level_number, tiles, rooms, player_start_pos, exit_pos, enemies, items, obstacles, pickups):
+        self.level_number = level_number
+        self.tiles = tiles # Matriz uint8 [x, y], como Map.tiles
+        self.rooms = rooms # [(x, y, w, h)], en el orden de Map.room_rects
+        self.player_start_pos = player_start_pos
+        self.exit_pos = exit_pos
+        self.enemies = enemies # [(enemy_type, x, y, state, room_id)]
+        self.items = items # [(item_id, x, y)]
+        self.obstacles = obstacles # [(x, y)]
+        self.pickups = pickups # [(pickup_type, x, y)]
+
+
+class _Marker:
+    """Ocupa un tile en el índice de ocupación del LevelBuilder mientras se genera."""
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class LevelBuilder:
+    """Hace las veces de PlayingState para Map.generate_dungeon y Room.generate_contents,
+    pero solo anota lo que se genera."""
+    def __init__(self, game, level_number, width=MAP_WIDTH, height=MAP_HEIGHT, max_rooms=10, rng=None):
+        self.game = game
+        self.level_number = level_number
+        self.rng = rng or game.rng.for_level(level_number) # Todas las tiradas de la generación
+        self.max_rooms = max_rooms # Intentos de colocar habitación (ver Map.generate_dungeon)
+        self.current_map = Map(game, width, height)
+        self.enemies = []
+        self.items = []
+        self.obstacles = []
+        self.pickups = []
+
+    def build(self):
+        """Genera el nivel y devuelve el snapshot. Mismo rng, mismo nivel."""
+        self.current_map.generate_dungeon(self, self.rng, max_rooms=self.max_rooms)
+        self.place_obstacles()
+        self.place_pickups()
+        return LevelSnapshot(self.level_number, self.current_map.tiles,
+                             [(room.x, room.y, room.width, room.height) for room in self.current_map.room_rects],
+                             self.current_map.player_start_pos, self.current_map.exit_pos,
+                             self.enemies, self.items, self.obstacles, self.pickups)
+
+    def spawn_enemy(self, enemy):
+        room_id = enemy.home_room_rect.level if enemy.home_room_rect is not None else -1
+        self.enemies.append((enemy.enemy_type, enemy.x, enemy.y, enemy.state, room_id))
+        self.current_map.occupancy.add("enemy", _Marker(enemy.x, enemy.y))
+
+    def spawn_item(self, item_id, x, y):
+        self.items.append((item_id, x, y))
+        self.current_map.occupancy.add("item", _Marker(x, y))
+
+    def place_obstacles(self):
+        current_map = self.current_map
+        valid_obstacle_tiles = []
+
+        for room_rect in current_map.room_rects:
+            for x_coord, y_coord in current_map.get_walkable_tiles_in_rect(room_rect):
+                if (x_coord, y_coord) != current_map.player_start_pos and \
+                   (x_coord, y_coord) != current_map.exit_pos:
+                    valid_obstacle_tiles.append((x_coord, y_coord))
+
+        self.rng.shuffle(valid_obstacle_tiles)
+        num_obstacles_to_add = self.rng.randint(3, 7)
+
+        for ox, oy in valid_obstacle_tiles:
+            if len(self.obstacles) >= num_obstacles_to_add:
+                break
+            if not current_map.occupancy.is_occupied(ox, oy, ("enemy", "item", "pickup")):
+                self.obstacles.append((ox, oy))
+                current_map.occupancy.add("obstacle", _Marker(ox, oy))
+
+        log.debug("Colocados %d obstáculos.", len(self.obstacles))
+
+    def place_pickups(self):
+        current_map = self.current_map
+        valid_spawn_tiles = []
+
+        # Iterar solo sobre los tiles dentro de las habitaciones
+        for room_rect in current_map.room_rects:
+            # No generar pickups en la habitación inicial (donde empieza el jugador)
+            if room_rect.level == 0: # Asumiendo que la habitación inicial tiene level 0
+                continue
+
+            for x_coord, y_coord in current_map.get_walkable_tiles_in_rect(room_rect):
+                # Asegurarse de que no sea la posición de inicio del jugador ni la salida
+                if (x_coord, y_coord) == current_map.player_start_pos or \
+                   (x_coord, y_coord) == current_map.exit_pos:
+                    continue
+                if not current_map.occupancy.is_occupied(x_coord, y_coord, ("obstacle", "enemy", "item")):
+                    valid_spawn_tiles.append((x_coord, y_coord))
+
+        self.rng.shuffle(valid_spawn_tiles)
+        num_pickups_to_add = 2
+
+        for px, py in valid_spawn_tiles[:num_pickups_to_add]:
+            self.pickups.append(("health_potion", px, py))
+            current_map.occupancy.add("pickup", _Marker(px, py))
+
+        log.debug("Colocados %d pickups.", len(self.pickups))
+
+
+class LevelPregenerator:
+    """Genera un nivel en un hilo aparte (p. ej. durante TransitionState)."""
+    def __init__(self, game, level_number):
+        self.level_number = level_number
+        self.snapshot = None
+        self.thread = threading.Thread(target=self._run, args=(game,), name=f"level-{level_number}", daemon=True)
+        self.thread.start()
+
+    def _run(self, game):
+        try:
+            self.snapshot = LevelBuilder(game, self.level_number).build()
+        except Exception:
+            # PlayingState generará el nivel por su cuenta
+            log.exception("Error pregenerando el nivel %d:", self.level_number)
+
+    def take(self):
+        """Espera a que acabe (normalmente ya lo ha hecho) y devuelve el snapshot, o None si falló."""
+        self.thread.join()
+        return self.snapshot
@@ -1,134 +1,128 @@
+import os
 import pygame
 import sys
 import json
+import struct
+import time
+from asset_loader import AssetLoader
+from game_log import configure_logging, get_logger, install_crash_handler
+from game_random import GameRandom
+from replay_log import ReplayRecorder
+from save_game import SAVE_FILE, SaveError, read_save, save_game
 from utils.constants import *
 from game_states import MenuState, PlayingState, GameOverState, VictoryState, TransitionState  # Importa las clases de estado
 
+log = get_logger("game")
+
+ASSET_PUMP_INTERVAL = 10 # ms entre recogidas de assets en modo render_on_change mientras se cargan
+
+
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, record_replays=None, log_level=None):
+        self.start_time = time.perf_counter()
+        self.time_to_first_frame_ms = None # Se mide en el primer draw()
+        # Modo sin ventana ni audio (drivers "dummy" de SDL y sonidos mudos), para
+        # simulaciones y pruebas controladas desde código (ver headless.HeadlessGame)
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(SCREEN_TITLE)
         self.clock = pygame.time.Clock()
         self.running = True
         self.config = self.load_config()
+        # Niveles de log por subsistema (config "log_level" y "log_levels"; `log_level` manda
+        # sobre el general, p. ej. para que las herramientas headless solo muestren avisos)
+        configure_logging(self.config, log_level)
+        # Modo "redibujar solo si hay cambios": el bucle duerme hasta el siguiente evento
+        self.render_on_change = self.config.get("render_on_change", False)
+        self.pending_events = [] # Eventos recogidos mientras se esperaba actividad
+        # Grabar cada partida (semilla y teclas) en replays/ para repetirla con replay.py.
+        # Es una ayuda de depuración: solo si se pide. None: lo que diga config.json ("record_replays")
+        self.record_replays = self.config.get("record_replays", False) if record_replays is None else record_replays
+        self.replay_recorder = None
 
         # Diccionario para almacenar las imágenes de los tiles por su tipo
         self.tile_images = {}
+        # Variantes tintadas de cada imagen: Surface original -> {nombre_tinte: Surface}
+        self.image_variants = {}
 
          # --- Carga de Assets ---
         self.load_assets() # Llama al método para cargar imágenes
 
         # Estado del juego 
         self.current_state = None
-        self.target_level_number = 1 # Nivel a cargar la próxima vez que se entre a PlayingState
+        self.new_run(seed)
         self.change_state(MenuState(self)) # Inicializa el juego con el estado de menú
     
 
+    def new_run(self, seed=None):
+        """Prepara una partida nueva desde el nivel 1. Sin `seed` se usa la de config.json
+        ("seed") o, si no hay, una al azar. Con la misma semilla, los mismos niveles."""
+        for attribute in ("persistent_player", "persistent_motorcycle"):
+            if hasattr(self, attribute):
+                delattr(self, attribute)
+        self.target_level_number = 1 # Nivel a cargar la próxima vez que se entre a PlayingState
+        self.pregenerated_level = None # LevelPregenerator del siguiente nivel (ver TransitionState)
+        self.rng = GameRandom(seed if seed is not None else self.config.get("seed"))
+        self.seed = self.rng.seed
+        log.info("Semilla de la partida: %s", self.seed)
+        if self.replay_recorder:
+            self.replay_recorder.close()
+        self.replay_recorder = ReplayRecorder.for_run(self.seed) if self.record_replays else None
+
     def load_config(self):
         """Carga la configuración desde config.json."""
         try:
             with open("config.json", 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
-            print("Advertencia: config.json no encontrado. Usando valores por defecto.")
-            return {"fov_enabled": True} # Valores por defecto si el archivo no existe
+            log.warning("config.json no encontrado. Usando valores por defecto.")
+            return {"fov_enabled": True, "fov_cache_size": 256, "render_on_change": False, "record_replays": False, "log_level": "INFO", "log_levels": {}, "crash_log_level": "INFO"} # Valores por defecto si el archivo no existe
         
     def load_assets(self):
-        """Carga todas las imágenes, sonidos, etc. del juego."""
-        try:
-            # Carga la imagen del jugador
-            # .convert_alpha() es importante para imágenes con transparencia
-            self.player_image = pygame.image.load("assets/sprites/player_biker.png").convert_alpha()
-            if self.player_image.get_width() != TILE_SIZE or self.player_image.get_height() != TILE_SIZE:
-                 self.player_image = pygame.transform.scale(self.player_image, (TILE_SIZE, TILE_SIZE))
-
-            # --- Carga de imágenes de tiles ---
-            # Asocia cada tipo de tile (constante) con la ruta de su imagen
-            tile_paths = {
-                TILE_ROAD: "assets/tiles/road.png",
-                TILE_WALL: "assets/tiles/wall.png",
-                #TILE_ABYSS: "assets/tiles/abyss.png", # Puedes usar una imagen negra
-                TILE_ENTRANCE: "assets/tiles/entrance.png",
-                TILE_EXIT: "assets/tiles/exit.png",
-                # Añade aquí otros tiles si los tienes, como TILE_GARAGE_FLOOR
-                TILE_GARAGE_FLOOR: "assets/tiles/garage_floor.png",
-                TILE_OBJECT: "assets/tiles/obstacle.png"
-            }
-           
-            self.welcome_image = pygame.image.load("assets/screens/welcome.png").convert_alpha() 
-            if self.welcome_image.get_width() != SCREEN_WIDTH or self.welcome_image.get_height() != SCREEN_HEIGHT:
-                self.welcome_image = pygame.transform.scale(self.welcome_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-            self.victory_image = pygame.image.load("assets/screens/victory.png").convert_alpha()  
-            if self.victory_image.get_width() != SCREEN_WIDTH or self.victory_image.get_height() != SCREEN_HEIGHT:
-                self.victory_image = pygame.transform.scale(self.victory_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-            self.game_over_image = pygame.image.load("assets/screens/game_over.png").convert_alpha()
-            if self.game_over_image.get_width() != SCREEN_WIDTH or self.game_over_image.get_height() != SCREEN_HEIGHT:
-                self.game_over_image = pygame.transform.scale(self.game_over_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-
-            # --- Cargar imagen para la pantalla de transición ---
-            self.transition_screen_image = pygame.image.load("assets/screens/transition_road.png").convert() # O .convert_alpha()
-            if self.transition_screen_image.get_width() != SCREEN_WIDTH or self.transition_screen_image.get_height() != SCREEN_HEIGHT:
-                self.transition_screen_image = pygame.transform.scale(self.transition_screen_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
-
-            for tile_type, path in tile_paths.items():
-                image = pygame.image.load(path).convert_alpha() # .convert_alpha() para transparencia
-                # Asegúrate de que la imagen del tile tenga el tamaño correcto
-                if image.get_width() != TILE_SIZE or image.get_height() != TILE_SIZE:
-                    image = pygame.transform.scale(image, (TILE_SIZE, TILE_SIZE))
-                self.tile_images[tile_type] = image
-
-            # --- Carga de imágenes de obstáculos ---
-            # Si los obstáculos son solo un color, no necesitas imagen.
-            # Pero si quieres un sprite para ellos:
-            self.obstacle_image = pygame.image.load("assets/tiles/obstacle.png").convert_alpha()
-            if self.obstacle_image.get_width() != TILE_SIZE:
-                self.obstacle_image = pygame.transform.scale(self.obstacle_image, (TILE_SIZE, TILE_SIZE))
-
-            # Carga la imagen del enemigo genérico
-            self.enemy_image = pygame.image.load("assets/sprites/enemy_basic.png").convert_alpha() # Asegúrate de tener esta imagen
-            if self.enemy_image.get_width() != TILE_SIZE:
-                self.enemy_image = pygame.transform.scale(self.enemy_image, (TILE_SIZE, TILE_SIZE))
-
-            # Carga la imagen para el Heavy Hitter
-            self.heavy_hitter_image = pygame.image.load("assets/sprites/enemy_heavy.png").convert_alpha() # Necesitas esta imagen
-            if self.heavy_hitter_image.get_width() != TILE_SIZE:
-                self.heavy_hitter_image = pygame.transform.scale(self.heavy_hitter_image, (TILE_SIZE, TILE_SIZE))
-
-            # Carga la imagen para el Acid Spitter
-            self.acid_spitter_image = pygame.image.load("assets/sprites/enemy_biker.png").convert_alpha() # Necesitas esta imagen
-            if self.acid_spitter_image.get_width() != TILE_SIZE:
-                self.acid_spitter_image = pygame.transform.scale(self.acid_spitter_image, (TILE_SIZE, TILE_SIZE))
-
-            # --- Carga de imágenes de pickups ---
-            self.pickup_health_image = pygame.image.load("assets/sprites/health_potion.png").convert_alpha()
-            if self.pickup_health_image.get_width() != TILE_SIZE:
-                self.pickup_health_image = pygame.transform.scale(self.pickup_health_image, (TILE_SIZE, TILE_SIZE))
-            # self.pickup_attack_image = pygame.image.load("assets/sprites/attack_boost.png").convert_alpha()
-            # if self.pickup_attack_image.get_width() != TILE_SIZE:
-            #     self.pickup_attack_image = pygame.transform.scale(self.pickup_attack_image, (TILE_SIZE, TILE_SIZE))
-
-            # --- Carga de Fuentes ---
-            pygame.font.init() # Inicializa el módulo de fuentes de Pygame si no lo está
-            self.font = pygame.font.Font(None, 24) # Fuente principal (tamaño 24)
-            self.font_small = pygame.font.Font(None, 18) # Fuente más pequeña (tamaño 18) para instrucciones, etc.
-
-            # --- Carga de sonidos ---
-            self.sound_attack = pygame.mixer.Sound("assets/sounds/attack.wav")
-            self.sound_hit = pygame.mixer.Sound("assets/sounds/hit.wav") # Sonido de recibir daño
-            self.sound_player_death = pygame.mixer.Sound("assets/sounds/player_death.wav")
-            self.sound_enemy_death = pygame.mixer.Sound("assets/sounds/enemy_death.wav")
-            self.sound_move = pygame.mixer.Sound("assets/sounds/move.wav") # Sonido de movimiento.
-            self.sound_pickup = pygame.mixer.Sound("assets/sounds/pickup.wav")
-
-
-            print("Assets cargados correctamente.")
-
-        except pygame.error as e:
-            print(f"Error al cargar asset: {e}")            
-            pygame.quit()
-            sys.exit() # Detiene el juego si los assets no se cargan
-            
+        """Carga lo imprescindible para el menú (fuentes y pantalla de bienvenida) y deja
+        el resto de imágenes y sonidos del manifiesto cargándose en segundo plano.
+        Un asset que falta se sustituye por un placeholder en vez de cerrar el juego."""
+        # --- Carga de Fuentes ---
+        pygame.font.init() # Inicializa el módulo de fuentes de Pygame si no lo está
+        self.font = pygame.font.Font(None, 24) # Fuente principal (tamaño 24)
+        self.font_small = pygame.font.Font(None, 18) # Fuente más pequeña (tamaño 18) para instrucciones, etc.
+        self.font_message = pygame.font.Font(None, FONT_DEFAULT_SIZE_SMALL) # Mensajes de PlayingState (ver MessageLog)
+
+        # --- Imágenes y sonidos (data/assets.json) ---
+        self.asset_loader = AssetLoader(self, null_sounds=self.headless)
+        if self.headless:
+            self.asset_loader.finish() # Sin primer frame que adelantar: cargar todo ya
+        else:
+            self.asset_loader.load_group("menu")
+            self.asset_loader.start_background() # El resto llega vía asset_loader.pump() en run()
+
+    def build_image_variants(self, image):
+        """Genera y guarda las variantes tintadas (IMAGE_TINTS) de una imagen."""
+        variants = {}
+        for name, (color, mode) in IMAGE_TINTS.items():
+            variant = image.copy()
+            if mode == "overlay":
+                overlay = pygame.Surface(image.get_size()).convert_alpha()
+                overlay.fill(color)
+                variant.blit(overlay, (0, 0))
+            else: # "add"
+                variant.fill(color, special_flags=pygame.BLEND_RGB_ADD)
+            variants[name] = variant
+        self.image_variants[image] = variants
+        return variants
+
+    def get_image_variant(self, image, variant_name):
+        """Devuelve una variante tintada de la imagen. Si la imagen no pasó por load_assets
+        (p. ej. un placeholder), sus variantes se generan la primera vez y quedan guardadas."""
+        variants = self.image_variants.get(image)
+        if variants is None:
+            variants = self.build_image_variants(image)
+        return variants[variant_name]
+
     def change_state(self, new_state):
         """Cambia el estado actual del juego."""
         if self.current_state:
@@ -137,11 +131,29 @@ class Game:
         self.current_state.enter_state() # Llama al método de entrada del nuevo estado
 
     def handle_input(self):
-        for event in pygame.event.get():
+        events = self.pending_events + pygame.event.get()
+        self.pending_events = []
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.current_state.mark_dirty() # La ventana se descubrió o cambió: repintar entera
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_F5, pygame.K_F9) \
+                    and isinstance(self.current_state, PlayingState):
+                # Guardado y carga rápidos: no llegan al estado (ni a la grabación de la partida)
+                if event.key == pygame.K_F5:
+                    self.save_current_game()
+                else:
+                    self.load_saved_game()
+                continue
             # Delega el manejo de entrada al estado actual
-            self.current_state.handle_input(event)
+            state = self.current_state
+            recording = self.replay_recorder is not None and isinstance(state, PlayingState)
+            if recording:
+                turns_before = state.turn_count
+            state.handle_input(event)
+            if recording:
+                self.replay_recorder.observe(state, event, turns_before)
 
             # Aquí añadiremos la lógica para manejar el teclado, ratón, etc.
             # Por ejemplo, para el movimiento del jugador, interacciones.
@@ -158,26 +170,108 @@ class Game:
         # Delega la actualización al estado actual
         self.current_state.update(dt)
 
+    def step(self, events=(), dt=1.0 / FPS, render=True):
+        """Un frame del bucle sin esperar al reloj: procesa `events`, actualiza `dt` segundos
+        y, si render, dibuja. Para manejar el juego desde código (modo headless)."""
+        self.pending_events.extend(events)
+        self.handle_input()
+        self.current_state.update(dt)
+        if render:
+            self.draw()
+
     def draw(self):
         # Delega el dibujo al estado actual
         self.current_state.draw(self.screen)
         pygame.display.flip()        
+        if self.time_to_first_frame_ms is None:
+            self.time_to_first_frame_ms = (time.perf_counter() - self.start_time) * 1000.0
+            log.info("Primer frame en %.0f ms.", self.time_to_first_frame_ms)
+
+    def draw_if_dirty(self):
+        """Dibuja solo si el estado actual informó de cambios (modo render_on_change)."""
+        full_redraw, dirty_rects = self.current_state.pop_dirty()
+        if full_redraw:
+            self.draw()
+        elif dirty_rects:
+            self.current_state.draw(self.screen)
+            pygame.display.update(dirty_rects) # Solo se envían a pantalla las zonas cambiadas
+
+    def wait_for_activity(self):
+        """Duerme hasta el siguiente evento o hasta que venza un temporizador del estado actual."""
+        if self.current_state.needs_full_redraw or self.current_state.dirty_rects:
+            return # Hay algo pendiente de dibujar: no esperar
+        wake_delay = self.current_state.get_wake_delay()
+        if not self.asset_loader.is_done: # Seguir recogiendo los assets que llegan del hilo de carga
+            wake_delay = min(wake_delay, ASSET_PUMP_INTERVAL) if wake_delay is not None else ASSET_PUMP_INTERVAL
+        if wake_delay is None:
+            event = pygame.event.wait()
+        else:
+            event = pygame.event.wait(max(1, int(wake_delay)))
+        if event.type != pygame.NOEVENT:
+            self.pending_events.append(event)
+        self.clock.tick() # El tiempo dormido cuenta para el dt de update()
 
     def run(self):
         while self.running:
+            if self.render_on_change:
+                self.wait_for_activity()
+            if not self.asset_loader.is_done:
+                self.asset_loader.pump()
             self.handle_input()
             self.update()
-            self.draw()
+            if self.render_on_change:
+                self.draw_if_dirty()
+            else:
+                self.draw()
             self.clock.tick(FPS)
 
+        if isinstance(self.current_state, PlayingState):
+            self.save_current_game() # Salir a mitad de partida no la pierde: se continúa desde el menú
+        if self.replay_recorder:
+            self.replay_recorder.close()
         pygame.quit()
         sys.exit()
+
+    def save_current_game(self, path=SAVE_FILE):
+        """Guarda la partida en curso (solo desde PlayingState). Devuelve True si se guardó."""
+        state = self.current_state
+        if not isinstance(state, PlayingState):
+            return False
+        try:
+            save_game(state, path, compress=self.config.get("compress_saves", True))
+        except (OSError, struct.error, ValueError) as e:
+            log.error("Error al guardar la partida en %s: %s", path, e)
+            state.show_message("No se pudo guardar la partida")
+            return False
+        state.show_message("Partida guardada")
+        return True
+
+    def load_saved_game(self, path=SAVE_FILE):
+        """Continúa la partida guardada en `path` sin regenerar el nivel. Devuelve True si se cargó."""
+        try:
+            saved = read_save(path)
+        except (OSError, SaveError) as e:
+            log.error("Error al cargar la partida de %s: %s", path, e)
+            return False
+        self.asset_loader.finish()
+        saved.prepare_game(self)
+        state = PlayingState(self, saved.snapshot)
+        saved.apply(state)
+        # Una partida cargada ya no se puede repetir desde su semilla: dejar de grabarla
+        if self.replay_recorder:
+            self.replay_recorder.close()
+            self.replay_recorder = None
+        self.change_state(state)
+        state.show_message("Partida cargada")
+        return True
     
     def request_state_change(self, new_state_name):
         """
         Solicita un cambio de estado del juego.
         Este método centraliza los cambios de estado para evitar importaciones circulares.
         """
+        if new_state_name != "menu":
+            self.asset_loader.finish() # Fuera del menú se necesitan todos los assets
         if new_state_name == "menu":
             self.change_state(MenuState(self))
         elif new_state_name == "playing":
@@ -196,8 +290,9 @@ class Game:
                 self.target_level_number = 1
                 self.change_state(TransitionState(self, self.target_level_number))
         else:
-            print(f"Error: Estado '{new_state_name}' desconocido.")
+            log.error("Estado '%s' desconocido.", new_state_name)
 
 if __name__ == "__main__":
+    install_crash_handler() # Deja crash.log con los últimos mensajes si el juego se cae
     game = Game()
     game.run()
\ No newline at end of file
@@ -0,0 +1,80 @@
+# message_log.py
+# Mensajes en pantalla de PlayingState: una cola acotada en la que cada mensaje guarda su
+# Surface ya renderizada, así que dibujar el registro cuesta un blit por línea y frame.
+# Se muestran las últimas MESSAGE_LOG_LINES que no han caducado (el más reciente en el
+# centro de la pantalla y los anteriores encima), así los mensajes de un mismo turno
+# (ataque, daño, botín) ya no se pisan.
+import collections
+
+from utils.constants import *
+
+MESSAGE_LOG_LINES = 4 # Líneas visibles a la vez
+MESSAGE_LOG_CAPACITY = 50 # Mensajes que se recuerdan (los más antiguos se descartan)
+MESSAGE_DURATION = 2000 # ms que se ve cada mensaje
+
+
+class Message:
+    __slots__ = ("text", "color", "timer", "surface")
+
+    def __init__(self, text, color, duration):
+        self.text = text
+        self.color = color
+        self.timer = duration # ms hasta que deja de mostrarse
+        self.surface = None # Se renderiza la primera vez que se dibuja y se reutiliza
+
+
+class MessageLog:
+    """Cola de mensajes con sus superficies cacheadas, dibujados con una fuente compartida."""
+    def __init__(self, font, max_lines=MESSAGE_LOG_LINES, capacity=MESSAGE_LOG_CAPACITY,
+                 duration=MESSAGE_DURATION):
+        self.font = font
+        self.max_lines = max_lines
+        self.duration = duration
+        self.messages = collections.deque(maxlen=capacity)
+        self.active = 0 # Mensajes al final de la cola que aún no han caducado
+        self.rect = None # Zona de pantalla que ocupó el último dibujo (para borrarla)
+
+    @property
+    def latest(self):
+        """Texto del último mensaje visible, o "" si no hay ninguno."""
+        return self.messages[-1].text if self.active else ""
+
+    def post(self, text, color=YELLOW):
+        self.messages.append(Message(text, color, self.duration))
+        self.active = min(self.active + 1, len(self.messages))
+
+    def update(self, dt_ms):
+        """Avanza los temporizadores. Devuelve True si algún mensaje dejó de verse."""
+        if not self.active:
+            return False
+        expired = 0
+        for index in range(len(self.messages) - self.active, len(self.messages)):
+            message = self.messages[index]
+            message.timer -= dt_ms
+            if message.timer <= 0:
+                expired += 1
+        # Todos duran lo mismo: los caducados son siempre los más antiguos de los activos
+        self.active -= expired
+        return expired > 0
+
+    def get_wake_delay(self):
+        """ms hasta que caduque el siguiente mensaje, o None si no hay ninguno visible."""
+        if not self.active:
+            return None
+        return self.messages[len(self.messages) - self.active].timer
+
+    def draw(self, screen):
+        visible = min(self.active, self.max_lines)
+        if not visible:
+            return
+        line_height = self.font.get_linesize()
+        center_x, bottom_center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+        drawn = None
+        for offset in range(visible):
+            message = self.messages[-1 - offset]
+            if message.surface is None:
+                message.surface = self.font.render(message.text, True, message.color)
+            rect = message.surface.get_rect(center=(center_x, bottom_center_y - offset * line_height))
+            screen.blit(message.surface, rect)
+            drawn = rect if drawn is None else drawn.union(rect)
+        self.rect = drawn
@@ -1,4 +1,8 @@
 # motorcycle.py
+from game_log import get_logger
+
+log = get_logger("player")
+
 class Motorcycle:
     def __init__(self, game):
         self.game = game
@@ -17,18 +21,18 @@ class Motorcycle:
         self.fuel_current += amount
         if self.fuel_current > self.fuel_max:
             self.fuel_current = self.fuel_max
-        print(f"Moto reabastecida. Combustible actual: {self.fuel_current}/{self.fuel_max}")
+        log.debug("Moto reabastecida. Combustible actual: %s/%s", self.fuel_current, self.fuel_max)
     
     def take_damage(self, amount):
         self.current_hp -= amount
         if self.current_hp < 0:
             self.current_hp = 0
-        print(f"Moto recibió {amount} de daño. HP actual: {self.current_hp}/{self.max_hp}")
+        log.debug("Moto recibió %s de daño. HP actual: %s/%s", amount, self.current_hp, self.max_hp)
         # Aquí podrías añadir lógica para cuando la moto se destruye
 
     def repair(self, amount):
         self.current_hp += amount
         if self.current_hp > self.max_hp:
             self.current_hp = self.max_hp
-        print(f"Moto reparada. HP actual: {self.current_hp}/{self.max_hp}")
+        log.debug("Moto reparada. HP actual: %s/%s", self.current_hp, self.max_hp)
 
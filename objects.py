@@ -1,7 +1,11 @@
 # objects.py
 import pygame
+from game_log import get_logger
+from image_cache import image_cache
 from utils.constants import *
 
+log = get_logger("assets")
+
 class Obstacle:
     def __init__(self, game,  x, y, width=TILE_SIZE, height=TILE_SIZE):
         self.game = game
@@ -16,9 +20,8 @@ class Obstacle:
             self.image = self.game.obstacle_image
         else:
             # Fallback a un cuadrado azul si la imagen no se carga
-            print("ADVERTENCIA: Imagen de obstáculo no cargada. Usando placeholder azul.")
-            self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            self.image.fill(BLUE) # El color azul que estás viendo
+            log.warning("Imagen de obstáculo no cargada. Usando placeholder azul.")
+            self.image = image_cache.get_placeholder((TILE_SIZE, TILE_SIZE), BLUE) # El color azul que estás viendo
             
     def get_rect(self):
         """Devuelve el rectángulo de posición del obstáculo en coordenadas del mundo."""
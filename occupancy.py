@@ -0,0 +1,56 @@
+# occupancy.py
+# Índice espacial de las entidades del nivel, para no recorrer listas enteras
+# cada vez que hay que saber qué hay en un tile.
+
+class OccupancyGrid:
+    """Diccionario (x, y) -> entidades, separado por capas.
+
+    Capas: "enemy", "obstacle", "item" y "pickup". Cada tile puede tener varias
+    entidades de la misma capa (p. ej. un ítem soltado encima de otro).
+    Las entidades solo necesitan atributos x e y en coordenadas de tile.
+    """
+    LAYERS = ("enemy", "obstacle", "item", "pickup")
+
+    def __init__(self):
+        self.layers = {layer: {} for layer in self.LAYERS}
+
+    def clear(self, layer=None):
+        """Vacía una capa, o todas si no se indica ninguna (nivel nuevo)."""
+        if layer is None:
+            for cells in self.layers.values():
+                cells.clear()
+        else:
+            self.layers[layer].clear()
+
+    def add(self, layer, entity):
+        self.layers[layer].setdefault((entity.x, entity.y), []).append(entity)
+
+    def remove(self, layer, entity):
+        """Quita la entidad de su tile actual (muerte, recogida...). No falla si no estaba."""
+        cells = self.layers[layer]
+        pos = (entity.x, entity.y)
+        cell = cells.get(pos)
+        if cell and entity in cell:
+            cell.remove(entity)
+            if not cell:
+                del cells[pos]
+
+    def move(self, layer, entity, new_x, new_y):
+        """Mueve la entidad a (new_x, new_y) manteniendo el índice al día."""
+        self.remove(layer, entity)
+        entity.x = new_x
+        entity.y = new_y
+        self.add(layer, entity)
+
+    def get(self, layer, x, y):
+        """Primera entidad de la capa en (x, y), o None."""
+        cell = self.layers[layer].get((x, y))
+        return cell[0] if cell else None
+
+    def get_all(self, layer, x, y):
+        return list(self.layers[layer].get((x, y), ()))
+
+    def is_occupied(self, x, y, layers=LAYERS):
+        """True si hay alguna entidad de las capas indicadas en (x, y)."""
+        pos = (x, y)
+        return any(pos in self.layers[layer] for layer in layers)
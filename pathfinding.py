@@ -0,0 +1,92 @@
+# pathfinding.py
+# Búsqueda de caminos sobre la rejilla del mapa.
+import heapq
+from collections import deque
+
+NEIGHBORS_4 = ((0, -1), (0, 1), (-1, 0), (1, 0)) # Los enemigos solo se mueven en 4 direcciones
+
+# Distancia máxima (en pasos) del mapa de distancias hacia el jugador. Solo lo consultan
+# los enemigos en estado attack, que pierden al jugador si se aleja más de
+# LOSE_TRACK_DISTANCE (5) salvo que compartan habitación, y una habitación mide como
+# mucho 12x12 (Map.generate_dungeon): 22 pasos de esquina a esquina, más margen para
+# rodear obstáculos. Así el BFS no recorre el mapa entero y su coste por turno no crece
+# con el tamaño del mapa. Un enemigo más lejos (p. ej. en una habitación mayor de un
+# mapa a medida) no está en el mapa de distancias y usa _move_towards_target.
+FLOW_FIELD_MAX_DISTANCE = 24
+
+
+def compute_distance_field(passable, start, max_distance=FLOW_FIELD_MAX_DISTANCE):
+    """BFS desde `start` sobre `passable` (lista [x][y] de bools).
+
+    Devuelve un diccionario (x, y) -> número de pasos hasta `start`, solo con los tiles
+    alcanzables a `max_distance` pasos o menos. `start` siempre está incluido.
+    """
+    width, height = len(passable), len(passable[0])
+    distances = {start: 0}
+    frontier = deque([start])
+    while frontier:
+        x, y = frontier.popleft()
+        next_distance = distances[(x, y)] + 1
+        if next_distance > max_distance:
+            continue
+        for dx, dy in NEIGHBORS_4:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and passable[nx][ny] and (nx, ny) not in distances:
+                distances[(nx, ny)] = next_distance
+                frontier.append((nx, ny))
+    return distances
+
+
+# Coste extra de atravesar un tile ocupado por otro enemigo: se prefiere rodearlo,
+# pero si es el único paso se planifica igualmente a través de él.
+ENEMY_SOFT_COST = 4
+PATH_MAX_EXPANSIONS = 4000 # Límite de nodos por búsqueda A* (destinos inalcanzables)
+
+
+def find_path(passable, start, goal, soft_cells=(), soft_cost=ENEMY_SOFT_COST, blocked=(), max_expansions=PATH_MAX_EXPANSIONS):
+    """A* en 4 direcciones desde `start` hasta `goal` sobre `passable` (lista [x][y] de bools).
+
+    `soft_cells` son tiles que cuestan `soft_cost` extra (enemigos) y `blocked` tiles que no se
+    pueden pisar (el jugador). Devuelve la lista de pasos [(x, y), ...] sin incluir `start`
+    (vacía si start == goal), o None si no hay camino.
+    """
+    if start == goal:
+        return []
+    width, height = len(passable), len(passable[0])
+    goal_x, goal_y = goal
+    if not (0 <= goal_x < width and 0 <= goal_y < height) or not passable[goal_x][goal_y] or goal in blocked:
+        return None
+
+    open_heap = [(abs(start[0] - goal_x) + abs(start[1] - goal_y), 0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    expansions = 0
+    while open_heap:
+        _, cost, current = heapq.heappop(open_heap)
+        if current == goal:
+            path = []
+            while current != start:
+                path.append(current)
+                current = came_from[current]
+            path.reverse()
+            return path
+        if cost > cost_so_far[current]: # Entrada obsoleta del heap
+            continue
+        expansions += 1
+        if expansions > max_expansions:
+            return None
+
+        x, y = current
+        for dx, dy in NEIGHBORS_4:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height) or not passable[nx][ny]:
+                continue
+            neighbor = (nx, ny)
+            if neighbor in blocked:
+                continue
+            new_cost = cost + 1 + (soft_cost if neighbor in soft_cells else 0)
+            if new_cost < cost_so_far.get(neighbor, new_cost + 1):
+                cost_so_far[neighbor] = new_cost
+                came_from[neighbor] = current
+                heapq.heappush(open_heap, (new_cost + abs(nx - goal_x) + abs(ny - goal_y), new_cost, neighbor))
+    return None
@@ -1,7 +1,11 @@
 # pickup.py
 import pygame
+from game_log import get_logger
+from image_cache import image_cache
 from utils.constants import *
 
+log = get_logger("items")
+
 class Pickup:
     def __init__(self, game, x, y, type):
         self.game = game
@@ -18,8 +22,7 @@ class Pickup:
         # elif self.type == "attack_boost":
         #     self.image = self.game.pickup_attack_image
         else:
-            self.image = pygame.Surface((TILE_SIZE, TILE_SIZE)) # Placeholder
-            self.image.fill(BLUE) # Un color si no hay imagen
+            self.image = image_cache.get_placeholder((TILE_SIZE, TILE_SIZE), BLUE) # Un color si no hay imagen
 
     def get_rect(self):
         return pygame.Rect(self.x * TILE_SIZE, self.y * TILE_SIZE, self.width, self.height)
@@ -38,7 +41,7 @@ class Pickup:
             heal_amount = 25 # Cantidad de vida a restaurar
             player.current_hp = min(player.max_hp, player.current_hp + heal_amount)
             self.game.current_state.show_message(f"¡Curado +{heal_amount} HP!")
-            print(f"Jugador curado. HP: {player.current_hp}/{player.max_hp}")
+            log.debug("Jugador curado. HP: %s/%s", player.current_hp, player.max_hp)
             self.game.sound_pickup.play() # Sonido de recogida (necesitas cargarlo)
 
         # Otros tipos de pickup aquí
@@ -1,8 +1,12 @@
 # player.py
 import pygame
 from utils.constants import *
+from game_log import get_logger
 from inventory import Inventory
 
+log = get_logger("player")
+combat_log = get_logger("combat")
+
 class Player:
     def __init__(self, game, start_x, start_y):
         self.game = game
@@ -40,9 +44,10 @@ class Player:
         actual_damage = max(1, damage - self.defense)
         self.current_hp -= actual_damage
         self.game.sound_hit.play() # Sonido de recibir daño
-        print(f"¡Jugador recibió {actual_damage} de daño! HP restantes: {self.current_hp}/{self.max_hp}")
+        self.game.current_state.flash_damage(self)
+        combat_log.debug("¡Jugador recibió %s de daño! HP restantes: %s/%s", actual_damage, self.current_hp, self.max_hp)
         if self.current_hp <= 0:
-            print("¡Has sido derrotado!")
+            log.info("¡Has sido derrotado!")
             self.game.sound_player_death.play() # Sonido de muerte del jugador
             self.game.request_state_change("game_over")
             return True # Jugador derrotado
@@ -65,7 +70,7 @@ class Player:
         # Aplica la defensa del enemigo
         actual_damage = max(0, damage - target_enemy.defense)
 
-        print(f"Player ataca a {target_enemy.enemy_type}. Daño base: {damage}, Daño real: {actual_damage}")
+        combat_log.debug("Player ataca a %s. Daño base: %s, Daño real: %s", target_enemy.enemy_type, damage, actual_damage)
 
         enemy_defeated = target_enemy.take_damage(actual_damage)
         return enemy_defeated
@@ -90,7 +95,7 @@ class Player:
                 poison_damage = effect_data["potency"]
                 self.current_hp -= poison_damage
                 self.game.current_state.show_message(f"El veneno te daña {poison_damage} HP.")
-                print(f"Jugador envenenado. HP: {self.current_hp}/{self.max_hp}")
+                log.debug("Jugador envenenado. HP: %s/%s", self.current_hp, self.max_hp)
                 if self.current_hp <= 0:
                     self.game.current_state.show_message("¡Has sucumbido al veneno! GAME OVER")
                     self.game.request_state_change("game_over")
@@ -99,7 +104,7 @@ class Player:
             elif effect_name == "corroded":
                 if effect_data["duration"] == self.status_effects[effect_name]["initial_duration"]: # Aplicar solo una vez al inicio
                     self.defense = max(0, self.defense - effect_data["potency"])
-                    print(f"Defensa del jugador reducida por corrosión a {self.defense}")
+                    log.debug("Defensa del jugador reducida por corrosión a %s", self.defense)
 
             effect_data["duration"] -= 1
             if effect_data["duration"] <= 0:
@@ -107,7 +112,7 @@ class Player:
                 self.game.current_state.show_message(f"El efecto '{effect_name}' ha terminado.")
                 if effect_name == "corroded": # Restaurar defensa
                     self.defense = self.base_defense + (self.inventory.equipped_armor.defense_bonus if self.inventory.equipped_armor else 0)
-                    print(f"Corrosión terminada. Defensa restaurada a {self.defense}")
+                    log.debug("Corrosión terminada. Defensa restaurada a %s", self.defense)
 
         for effect_name in effects_to_remove:
             del self.status_effects[effect_name]
@@ -125,11 +130,9 @@ class Player:
             return False # No es un tile caminable, no se mueve
 
         # 2. Luego, verifica si la nueva posición está ocupada por un obstáculo
-        # Itera sobre los obstáculos del mapa
-        for obstacle in current_map.obstacles:
-            if obstacle.x == new_x and obstacle.y == new_y:
-                print("¡Colisión con un obstáculo!")
-                return False # Hay un obstáculo, no se mueve
+        if current_map.occupancy.is_occupied(new_x, new_y, ("obstacle",)):
+            log.debug("¡Colisión con un obstáculo!")
+            return False # Hay un obstáculo, no se mueve
 
         # Si el código llega aquí, la nueva posición es caminable y no hay obstáculos
         # Guardar el tipo de tile actual del jugador antes de moverse
@@ -142,8 +145,8 @@ class Player:
         if current_map.is_walkable(new_x, new_y):
             # Si el jugador se mueve desde la posición de entrada o salida (que ahora son paredes),
             # restaura el tile original a TILE_WALL.
-            if current_map.tiles[original_player_x][original_player_y] == TILE_ENTRANCE or \
-               current_map.tiles[original_player_x][original_player_y] == TILE_EXIT:
+            if current_map.tiles[original_player_x, original_player_y] == TILE_ENTRANCE or \
+               current_map.tiles[original_player_x, original_player_y] == TILE_EXIT:
                 # No cambiamos el tile de la entrada/salida a TILE_WALL inmediatamente,
                 # ya que el jugador podría querer volver a entrar/salir si se implementa esa lógica.
                 # Por ahora, simplemente nos movemos. El tile de entrada/salida permanece.
@@ -156,8 +159,8 @@ class Player:
             self.y = new_y
 
             # Si el jugador llega a la salida, haz algo (por ejemplo, print)
-            if current_map.tiles[self.x][self.y] == TILE_EXIT:
-                print("¡Has llegado a la salida!")                         
+            if current_map.tiles[self.x, self.y] == TILE_EXIT:
+                log.debug("¡Has llegado a la salida!")
             
             return True
 
@@ -166,16 +169,17 @@ class Player:
         return pygame.Rect(self.x * TILE_SIZE, self.y * TILE_SIZE, self.width, self.height)
 
 
-    def draw(self, screen, camera):
-        # Dibuja el jugador, aplicando el desplazamiento de la cámara
-        screen.blit(self.game.player_image, camera.apply(self.get_rect()))
+    def draw(self, screen, camera, flashing=False):
+        # Dibuja el jugador, aplicando el desplazamiento de la cámara (con destello si le acaban de golpear)
+        image = self.game.get_image_variant(self.game.player_image, "damage_flash") if flashing else self.game.player_image
+        screen.blit(image, camera.apply(self.get_rect()))
        
     
     # --- Nuevo método para aplicar efectos de estado ---
     def apply_effect(self, effect_name, duration, potency=0):
         # Guardar la duración inicial para efectos que se aplican una vez (como reducción de defensa)
         self.status_effects[effect_name] = {"duration": duration, "potency": potency, "initial_duration": duration}
-        print(f"Efecto de estado '{effect_name}' aplicado al jugador. Duración: {duration}, Potencia: {potency}")
+        log.debug("Efecto de estado '%s' aplicado al jugador. Duración: %s, Potencia: %s", effect_name, duration, potency)
 
         # Aplicar efecto inmediato si es necesario (ej. corrosión que reduce defensa al instante)
         if effect_name == "corroded":
@@ -0,0 +1,80 @@
+# replay.py
+# Repite una partida grabada por Game (ver replay_log) sin ventana ni esperas de reloj:
+# las teclas de cada turno se pasan tal cual a PlayingState.handle_input y, al acabar el
+# turno, se compara el checksum del estado con el grabado. Si no coincide, la partida
+# diverge en ese turno y se para. Sirve también de carga de trabajo realista para medir.
+#
+# Uso: python replay.py replays/run_<semilla>_<fecha>.replay [--render] [--repeat 3]
+import argparse
+import statistics
+import time
+
+import pygame
+from game_states import PlayingState, TransitionState
+from headless import HeadlessGame
+from replay_log import ReplayError, read_replay, state_checksum
+
+
+def run_replay(path, render=False, log_level=None):
+    """Repite la partida de `path`. Devuelve [(ms, nivel)] por turno; lanza ReplayError
+    en el primer turno cuyo resultado no coincide con la grabación."""
+    seed, turns = read_replay(path)
+    headless = HeadlessGame(render=render, seed=seed, log_level=log_level)
+    headless.new_game(seed)
+    game = headless.game
+    turn_times = []
+
+    for index, (keys, checksum) in enumerate(turns):
+        while isinstance(headless.state, TransitionState):
+            headless.advance(headless.state.timer + 1) # El siguiente nivel ya no depende del tiempo
+        state = headless.state
+        if not isinstance(state, PlayingState):
+            raise ReplayError(f"Turno {index}: la partida acabó antes que la grabación ({type(state).__name__})")
+
+        turns_before = state.turn_count
+        start = time.perf_counter()
+        for key in keys:
+            state.handle_input(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+        if render:
+            game.current_state.draw(game.screen)
+        turn_times.append(((time.perf_counter() - start) * 1000.0, state.current_level_number))
+
+        if state.turn_count == turns_before:
+            raise ReplayError(f"Turno {index}: las teclas {keys} no resolvieron ningún turno")
+        if state_checksum(state) != checksum:
+            raise ReplayError(f"Turno {index} (nivel {state.current_level_number}, turno {state.turn_count} del nivel): "
+                              f"el estado no coincide con la grabación")
+    return turn_times
+
+
+def report(turn_times):
+    times = sorted(ms for ms, _ in turn_times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    elapsed = sum(times) / 1000.0 # Solo los turnos: sin arrancar el juego ni las transiciones
+    print(f"{len(times)} turnos en {elapsed:.2f} s: {len(times) / elapsed:.0f} turnos/s   "
+          f"mediana {statistics.median(times):.3f} ms   p95 {p95:.3f} ms   máx. {times[-1]:.3f} ms")
+    for level in sorted({level for _, level in turn_times}):
+        level_times = [ms for ms, turn_level in turn_times if turn_level == level]
+        print(f"  nivel {level}: {len(level_times)} turnos, mediana {statistics.median(level_times):.3f} ms, "
+              f"máx. {max(level_times):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repite una partida grabada y comprueba cada turno")
+    parser.add_argument("path")
+    parser.add_argument("--render", action="store_true", help="Dibujar cada turno (en una pantalla virtual)")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones (para medir)")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de log del juego (DEBUG, INFO, WARNING...)")
+    args = parser.parse_args()
+
+    for _ in range(args.repeat):
+        try:
+            turn_times = run_replay(args.path, render=args.render, log_level=args.log_level)
+        except ReplayError as e:
+            print(f"La repetición diverge: {e}")
+            raise SystemExit(1)
+        report(turn_times)
+
+
+if __name__ == "__main__":
+    main()
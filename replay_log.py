@@ -0,0 +1,107 @@
+# replay_log.py
+# Registro compacto de una partida para poder repetirla (ver replay.py): la semilla
+# (ver GameRandom) y, por cada turno resuelto, las teclas que llegaron a PlayingState y
+# un checksum del estado al acabar el turno. Con la semilla y las teclas, la partida se
+# reproduce igual; el checksum delata en qué turno deja de hacerlo.
+#
+# Formato (little-endian):
+#   cabecera: b"MRPL", versión (uint16), semilla (uint64)
+#   por turno: nº de teclas (uint16), checksum (uint32), teclas (uint32 cada una)
+import os
+import struct
+import time
+import zlib
+
+import pygame
+from game_log import get_logger
+from game_random import normalize_seed
+
+log = get_logger("replay")
+
+REPLAY_MAGIC = b"MRPL"
+REPLAY_VERSION = 1
+REPLAY_DIR = "replays"
+
+HEADER = struct.Struct("<4sHQ")
+TURN = struct.Struct("<HI")
+
+
+class ReplayError(Exception):
+    pass
+
+
+def state_checksum(state):
+    """CRC32 del estado de juego de un PlayingState: nivel, turno, jugador, moto,
+    inventario, ítems en el suelo y todas las columnas del EnemyStore."""
+    player = state.player
+    fuel = state.motorcycle.fuel_current if state.motorcycle else -1.0
+    checksum = zlib.crc32(struct.pack("<5i3d3i", state.current_level_number, state.turn_count,
+                                      player.x, player.y, player.cooldown_powerful_attack,
+                                      player.current_hp, player.max_hp, fuel,
+                                      len(player.inventory.items), len(state.items_on_map), len(state.pickups)))
+    store = state.enemy_store
+    for column in store.columns.values():
+        checksum = zlib.crc32(column[:store.count].tobytes(), checksum)
+    return checksum
+
+
+class ReplayRecorder:
+    """Escribe el registro de una partida a medida que se juega (un turno por escritura,
+    para no perderlo si el juego se cierra a mitad). El fichero se crea con el primer
+    turno: una partida sin turnos no deja nada."""
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = normalize_seed(seed) # La cabecera la guarda como uint64
+        self.pending_keys = [] # Teclas desde el último turno resuelto
+        self.turns = 0
+        self.file = None
+
+    @classmethod
+    def for_run(cls, seed, directory=REPLAY_DIR):
+        """Recorder con un fichero nuevo en `directory`, con la semilla y la hora en el nombre."""
+        return cls(os.path.join(directory, f"run_{seed}_{time.strftime('%Y%m%d_%H%M%S')}.replay"), seed)
+
+    def observe(self, state, event, turns_before):
+        """Llamar después de pasar `event` a state.handle_input (PlayingState)."""
+        if event.type == pygame.KEYDOWN:
+            self.pending_keys.append(event.key)
+        if state.turn_count != turns_before:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self.file = open(self.path, 'wb')
+                self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed))
+            keys = self.pending_keys
+            self.file.write(TURN.pack(len(keys), state_checksum(state)))
+            self.file.write(struct.pack(f"<{len(keys)}I", *keys))
+            self.file.flush()
+            self.pending_keys = []
+            self.turns += 1
+
+    def close(self):
+        """Cierra el fichero. Las teclas que no llegaron a resolver un turno se descartan."""
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+            log.info("Partida grabada en %s (%d turnos).", self.path, self.turns)
+
+
+def read_replay(path):
+    """Devuelve (semilla, [(teclas, checksum)]) de un fichero de ReplayRecorder."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ReplayError(f"{path}: fichero demasiado corto")
+    magic, version, seed = HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ReplayError(f"{path}: no es un registro de partida (versión {REPLAY_VERSION})")
+
+    turns = []
+    offset = HEADER.size
+    while offset + TURN.size <= len(data):
+        key_count, checksum = TURN.unpack_from(data, offset)
+        offset += TURN.size
+        if offset + 4 * key_count > len(data):
+            break # Último turno a medio escribir (el juego se cerró): se ignora
+        keys = struct.unpack_from(f"<{key_count}I", data, offset)
+        offset += 4 * key_count
+        turns.append((keys, checksum))
+    return seed, turns
@@ -1,9 +1,14 @@
 # Una clase que es una habitacion del juego donde tendra una posicion y un tamaño, un nivel. Ademas de una lista de objetos y enemigos, y una lista de puertas.
 import pygame
-import random
 from utils.constants import *
 from enemy import Enemy
-from item import Weapon, Armor, Consumable
+from enemy_archetypes import choose_enemy_type
+from game_log import get_logger
+
+# Ítems que pueden aparecer en el suelo de una habitación (ids de data/items.json)
+ROOM_ITEMS = ("wrench", "leather_vest", "coffee", "spiked_bat", "gas_can", "repair_kit")
+
+log = get_logger("generation")
 
 class Room(pygame.Rect):
     def __init__(self, game, x, y, width, height, level):
@@ -24,76 +29,59 @@ class Room(pygame.Rect):
                 self.y < other.y + other.height and self.y + self.height > other.y)
     
    
-    def generate_contents(self, playing_state):
-        """Genera enemigos e ítems dentro de esta habitación y los añade a PlayingState."""
+    def generate_contents(self, playing_state, rng):
+        """Genera enemigos e ítems dentro de esta habitación y los añade al nivel (ver LevelBuilder).
+        Todas las tiradas salen de `rng`, el generador del nivel."""
         
         # Obtener tiles caminables dentro de la habitación (excluyendo bordes si son paredes)
         # Asumimos que los tiles internos de la habitación ya son caminables (TILE_GARAGE_FLOOR)
         possible_spawn_points = []
-        for r_x in range(self.left, self.right): # Iterar sobre el interior de la habitación
-            for r_y in range(self.top, self.bottom):
-                # Asegurarse de que no sea la posición de inicio del jugador ni la salida del mapa
-                if (r_x, r_y) != playing_state.current_map.player_start_pos and \
-                   (r_x, r_y) != playing_state.current_map.exit_pos:
-                    possible_spawn_points.append((r_x, r_y))
+        for r_x, r_y in playing_state.current_map.room_tiles[self.level]: # Tiles del interior de la habitación
+            # Asegurarse de que no sea la posición de inicio del jugador ni la salida del mapa
+            if (r_x, r_y) != playing_state.current_map.player_start_pos and \
+               (r_x, r_y) != playing_state.current_map.exit_pos:
+                possible_spawn_points.append((r_x, r_y))
         
-        random.shuffle(possible_spawn_points)
+        rng.shuffle(possible_spawn_points)
         
         # --- Generar Enemigos (solo si no es la habitación inicial) ---
         if self.level != 0: # La habitación 0 es la inicial
-            num_enemies_to_spawn = random.randint(0, 5)
+            num_enemies_to_spawn = rng.randint(0, 5)
             for _ in range(num_enemies_to_spawn):
                 if not possible_spawn_points: break # No más puntos disponibles
                 
                 spawn_x, spawn_y = possible_spawn_points.pop()
                 
-                 # Decidir tipo de enemigo
-                rand_val = random.random()
-                if rand_val < 0.5: # 50%
-                    enemy_type = "basic_grunt"
-                elif rand_val < 0.8: # 30%
-                    enemy_type = "heavy_hitter" 
-                else: # 20%
-                    enemy_type = "acid_spitter"
+                 # Decidir tipo de enemigo (según spawn_weight de data/enemies.json)
+                enemy_type = choose_enemy_type(rng.random())
                 
-                initial_state = random.choice(["idle", "alert"])
+                initial_state = rng.choice(["idle", "alert"])
                 
                 new_enemy = Enemy(self.game, spawn_x, spawn_y, enemy_type, room_rect=self)
                 new_enemy.state = initial_state # Establecer estado inicial
-                playing_state.enemies.append(new_enemy)
-                print(f"Room {self.level} generó {enemy_type} en ({spawn_x},{spawn_y}) en estado {initial_state}")
+                playing_state.spawn_enemy(new_enemy)
+                log.debug("Room %d generó %s en (%d,%d) en estado %s", self.level, enemy_type, spawn_x, spawn_y, initial_state)
         else:
-            print(f"Room {self.level} (inicial) no generará enemigos.")
+            log.debug("Room %d (inicial) no generará enemigos.", self.level)
 
         # --- Generar Ítems ---
-        num_items_to_spawn = random.randint(0, 3)
-        available_items = [
-            Weapon(self.game, "Llave Inglesa", "Un arma de mano oxidada.", 5, "assets/items/wrench.png"),
-            Armor(self.game, "Chaleco Cuero", "Protección básica de motero.", 3, "assets/items/leather_vest.png"),
-            Consumable(self.game, "Café Turbo", "Te da un subidón de energía.", {"heal": 10}, "assets/items/coffee.png"),
-            Weapon(self.game, "Bate con Clavos", "¡Duele mucho!", 10, "assets/items/spiked_bat.png"),
-            Consumable(self.game, "Bidón Gasolina", "Rellena combustible de la moto.", {"refuel": 50}, "assets/items/gas_can.png"),
-            Consumable(self.game, "Kit Reparación", "Repara la motocicleta.", {"repair_moto": 40}, "assets/items/repair_kit.png") # NUEVO
-        ]
+        num_items_to_spawn = rng.randint(0, 3)
         for _ in range(num_items_to_spawn):
-            if not possible_spawn_points or not available_items: break
+            if not possible_spawn_points: break
             
             spawn_x, spawn_y = possible_spawn_points.pop()
-            item_to_place = random.choice(available_items) # Podrías querer evitar duplicados o tener una lista más grande
-            item_to_place.x = spawn_x
-            item_to_place.y = spawn_y
-            playing_state.items_on_map.append(item_to_place)
-            print(f"Room {self.level} generó {item_to_place.name} en ({spawn_x},{spawn_y})")
+            item_id = rng.choice(ROOM_ITEMS)
+            playing_state.spawn_item(item_id, spawn_x, spawn_y) # El ítem (y su imagen) se crea al adoptar el nivel
+            log.debug("Room %d generó %s en (%d,%d)", self.level, item_id, spawn_x, spawn_y)
         
-    def create_room(self, tiles, tile_type):  
-        for x in range(min(self.left - 1, self.right + 1), max(self.left - 1, self.right + 1) + 1):
-            for y in range(min(self.top - 1, self.bottom + 1), max(self.top - 1, self.bottom + 1) + 1):                 
-                if 0 <= x < len(tiles) and 0 <= y < len(tiles[x]) and tiles[x][y] == TILE_ABYSS:
-                    tiles[x][y] = TILE_WALL
-                              
-        for x in range(min(self.left, self.right), max(self.left, self.right) + 1):
-            for y in range(min(self.top, self.bottom), max(self.top, self.bottom) + 1):  
-                if 0 <= x < len(tiles) and 0 <= y < len(tiles[x]):              
-                    tiles[x][y] = tile_type
+    def create_room(self, tiles, tile_type):
+        """Talla la habitación en la matriz de tiles [x, y]: paredes alrededor y suelo dentro."""
+        map_width, map_height = tiles.shape
+
+        # Paredes solo donde todavía hay abismo (no pisar pasillos ni otras habitaciones)
+        border = tiles[max(0, self.left - 1):min(map_width, self.right + 2),
+                       max(0, self.top - 1):min(map_height, self.bottom + 2)]
+        border[border == TILE_ABYSS] = TILE_WALL
 
-        
\ No newline at end of file
+        tiles[max(0, self.left):min(map_width, self.right + 1),
+              max(0, self.top):min(map_height, self.bottom + 1)] = tile_type
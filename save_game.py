@@ -0,0 +1,326 @@
+# save_game.py
+# Partida guardada en binario compacto: el nivel actual (tiles, visibilidad, habitaciones,
+# enemigos con su estado de IA, ítems, obstáculos y pickups), el jugador con su inventario,
+# la moto y los generadores aleatorios. Todo va en arrays empaquetados (NumPy/struct),
+# opcionalmente comprimidos con zlib; nada de pickle ni de objetos de pygame. Al cargar no
+# se vuelve a generar el nivel: se adopta como un LevelSnapshot (ver Game.load_saved_game).
+#
+# Formato (little-endian): cabecera b"MSAV", versión (uint16), flags (uint16), tamaño de los
+# datos sin comprimir (uint32) y los datos, en el orden en que los escribe save_game.
+import math
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+from enemy_store import STATE_NAMES, EnemyStore
+from game_log import get_logger
+from game_random import GameRandom
+from level_generator import LevelSnapshot
+from motorcycle import Motorcycle
+from player import Player
+from item import create_item
+
+log = get_logger("save")
+
+SAVE_FILE = "saves/savegame.sav"
+SAVE_MAGIC = b"MSAV"
+SAVE_VERSION = 2
+FLAG_ZLIB = 1
+
+HEADER = struct.Struct("<4sHHI")
+
+
+class SaveError(Exception):
+    pass
+
+
+def _le(dtype):
+    """El dtype en little-endian, para que el fichero no dependa de la máquina."""
+    return np.dtype(dtype).newbyteorder("<")
+
+
+def _xy(positions):
+    """Lista de (x, y) como array int32 de forma (n, 2), también si está vacía."""
+    return np.array(positions, dtype="<i4").reshape(-1, 2)
+
+
+def _number(value):
+    """Los float enteros vuelven como int (HP, ataque... son int salvo tras ciertos efectos)."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(struct.pack(fmt, *values))
+
+    def array(self, values, dtype):
+        array = np.ascontiguousarray(values, dtype=_le(dtype))
+        self.pack(f"<B{array.ndim}I", array.ndim, *array.shape)
+        self.parts.append(array.tobytes())
+
+    def strings(self, values):
+        self.pack("<H", len(values))
+        for value in values:
+            encoded = value.encode("utf-8")
+            self.pack("<H", len(encoded))
+            self.parts.append(encoded)
+
+    def rng_state(self, rng):
+        version, internal_state, gauss_next = rng.getstate()
+        self.pack("<Bd", version, math.nan if gauss_next is None else gauss_next)
+        self.array(internal_state, "<u4")
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def array(self, dtype):
+        dtype = _le(dtype)
+        (ndim,) = self.unpack("<B")
+        shape = self.unpack(f"<{ndim}I")
+        count = math.prod(shape)
+        array = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.offset).reshape(shape)
+        self.offset += count * dtype.itemsize
+        return array
+
+    def strings(self):
+        (count,) = self.unpack("<H")
+        values = []
+        for _ in range(count):
+            (length,) = self.unpack("<H")
+            values.append(self.data[self.offset:self.offset + length].decode("utf-8"))
+            self.offset += length
+        return values
+
+    def rng_state(self):
+        version, gauss_next = self.unpack("<Bd")
+        internal_state = tuple(self.array("<u4").tolist())
+        return version, internal_state, None if math.isnan(gauss_next) else gauss_next
+
+
+def save_game(state, path=SAVE_FILE, compress=True):
+    """Guarda la partida de un PlayingState en `path`. Devuelve el tamaño en bytes."""
+    start = time.perf_counter()
+    game = state.game
+    current_map = state.current_map
+    player = state.player
+    inventory = player.inventory
+    motorcycle = state.motorcycle
+    names = [] # Tabla de nombres (tipos de enemigo, ids de ítem...); en los arrays van índices
+    name_index = {}
+
+    def index_of(name):
+        if name not in name_index:
+            name_index[name] = len(names)
+            names.append(name)
+        return name_index[name]
+
+    enemies = [enemy for enemy in state.enemies if enemy.is_alive]
+    rows = np.array([enemy._store_index for enemy in enemies], dtype=np.intp)
+    pickups = [pickup for pickup in state.pickups if not pickup.is_collected]
+    effects = list(player.status_effects.items())
+
+    writer = _Writer()
+    writer.pack("<QIIB", game.seed, state.current_level_number, state.turn_count,
+                state.awaiting_powerful_attack_target)
+    for rng in (game.rng.ai, game.rng.loot, game.rng.ui):
+        writer.rng_state(rng)
+
+    # Índices a la tabla de nombres (se escribe antes de usarlos, así que se calculan ya)
+    enemy_types = [index_of(enemy.enemy_type) for enemy in enemies]
+    item_ids = [index_of(item.item_id) for item in state.items_on_map]
+    pickup_types = [index_of(pickup.type) for pickup in pickups]
+    inventory_ids = [index_of(item.item_id) for item in inventory.items]
+    effect_names = [index_of(name) for name, _ in effects]
+    writer.strings(names)
+
+    # Mapa
+    writer.array(current_map.tiles, "<u1")
+    writer.array(current_map.visibility_map, "<u1")
+    writer.array([(room.x, room.y, room.width, room.height) for room in current_map.room_rects], "<i4")
+    writer.pack("<4i", *current_map.player_start_pos, *current_map.exit_pos)
+
+    # Enemigos: tipo, habitación, objetivos de la IA y todas las columnas del EnemyStore
+    writer.array(enemy_types, "<u2")
+    writer.array([enemy.home_room_rect.level if enemy.home_room_rect is not None else -1 for enemy in enemies], "<i2")
+    writer.array(_xy([enemy.patrol_target or (-1, -1) for enemy in enemies]), "<i4")
+    writer.array(_xy([enemy.last_known_player_pos or (-1, -1) for enemy in enemies]), "<i4")
+    # Camino A* cacheado (ver Enemy._follow_path): solo los que siguen valiendo para este
+    # mapa; si no, se guarda vacío y el enemigo replanifica igual que lo haría sin cargar
+    paths = [enemy.path if enemy.path_revision == current_map.revision else [] for enemy in enemies]
+    writer.array([len(path) for path in paths], "<u2")
+    writer.array(_xy([step for path in paths for step in path]), "<i4")
+    writer.array(_xy([enemy.path_goal if path else (-1, -1) for enemy, path in zip(enemies, paths)]), "<i4")
+    for name, dtype in EnemyStore.COLUMNS.items():
+        writer.array(state.enemy_store.columns[name][rows], dtype)
+
+    # Ítems en el suelo, obstáculos y pickups
+    writer.array(item_ids, "<u2")
+    writer.array(_xy([(item.x, item.y) for item in state.items_on_map]), "<i4")
+    writer.array(_xy([(obstacle.x, obstacle.y) for obstacle in current_map.obstacles]), "<i4")
+    writer.array(pickup_types, "<u2")
+    writer.array(_xy([(pickup.x, pickup.y) for pickup in pickups]), "<i4")
+
+    # Jugador, inventario y moto
+    writer.pack("<2i", player.x, player.y)
+    writer.array([player.current_hp, player.max_hp, player.base_attack, player.base_defense, player.attack,
+                  player.defense, player.cooldown_powerful_attack, player.max_cooldown_powerful_attack], "<f8")
+    equipped = [next((i for i, item in enumerate(inventory.items) if item is equipped_item), -1)
+                for equipped_item in (inventory.equipped_weapon, inventory.equipped_armor)]
+    writer.pack("<4i", inventory.capacity, inventory.selected_item_index, *equipped)
+    writer.array(inventory_ids, "<u2")
+    writer.array(effect_names, "<u2")
+    writer.array([(data["duration"], data["potency"], data["initial_duration"]) for _, data in effects], "<f8")
+    writer.array([motorcycle.fuel_max, motorcycle.fuel_current, motorcycle.max_hp, motorcycle.current_hp], "<f8")
+
+    payload = writer.getvalue()
+    flags = FLAG_ZLIB if compress else 0
+    data = HEADER.pack(SAVE_MAGIC, SAVE_VERSION, flags, len(payload)) + (zlib.compress(payload) if compress else payload)
+    encode_ms = (time.perf_counter() - start) * 1000.0
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path) # Un cierre a mitad no deja un fichero corrupto
+    log.info("Partida guardada en %s (%d bytes, %.1f ms empaquetando, %.1f ms en total).",
+             path, len(data), encode_ms, (time.perf_counter() - start) * 1000.0)
+    return len(data)
+
+
+class SavedGame:
+    """Partida leída con read_save. Se adopta en dos pasos (ver Game.load_saved_game):
+    prepare_game antes de crear el PlayingState con `snapshot` y apply después."""
+    def __init__(self, reader):
+        self.seed, self.level_number, self.turn_count, awaiting = reader.unpack("<QIIB")
+        self.awaiting_powerful_attack_target = bool(awaiting)
+        self.rng_states = [reader.rng_state() for _ in range(3)] # ai, loot, ui
+        names = reader.strings()
+
+        tiles = reader.array("<u1").copy()
+        self.visibility = reader.array("<u1")
+        rooms = [tuple(room) for room in reader.array("<i4").reshape(-1, 4).tolist()]
+        start_x, start_y, exit_x, exit_y = reader.unpack("<4i")
+
+        enemy_types = reader.array("<u2").tolist()
+        enemy_rooms = reader.array("<i2").tolist()
+        self.patrol_targets = reader.array("<i4").tolist()
+        self.last_known_player_positions = reader.array("<i4").tolist()
+        path_lengths = reader.array("<u2").tolist()
+        path_steps = [tuple(step) for step in reader.array("<i4").tolist()]
+        path_starts = np.concatenate(([0], np.cumsum(path_lengths, dtype=np.int64))).tolist()
+        self.enemy_paths = [path_steps[start:end] for start, end in zip(path_starts, path_starts[1:])]
+        self.path_goals = reader.array("<i4").tolist()
+        self.enemy_columns = {name: reader.array(dtype) for name, dtype in EnemyStore.COLUMNS.items()}
+        columns = self.enemy_columns
+        enemies = [(names[enemy_type], x, y, STATE_NAMES[state], room_id) for enemy_type, x, y, state, room_id
+                   in zip(enemy_types, columns["x"].tolist(), columns["y"].tolist(), columns["state"].tolist(), enemy_rooms)]
+
+        item_ids = reader.array("<u2").tolist()
+        items = [(names[item_id], x, y) for item_id, (x, y) in zip(item_ids, reader.array("<i4").tolist())]
+        obstacles = [tuple(position) for position in reader.array("<i4").tolist()]
+        pickup_types = reader.array("<u2").tolist()
+        pickups = [(names[pickup_type], x, y) for pickup_type, (x, y) in zip(pickup_types, reader.array("<i4").tolist())]
+
+        self.player_pos = reader.unpack("<2i")
+        self.player_stats = [_number(value) for value in reader.array("<f8").tolist()]
+        self.inventory_state = reader.unpack("<4i")
+        self.inventory_items = [names[item_id] for item_id in reader.array("<u2").tolist()]
+        effect_names = [names[index] for index in reader.array("<u2").tolist()]
+        self.status_effects = {name: {"duration": _number(duration), "potency": _number(potency),
+                                      "initial_duration": _number(initial_duration)}
+                               for name, (duration, potency, initial_duration)
+                               in zip(effect_names, reader.array("<f8").reshape(-1, 3).tolist())}
+        self.motorcycle_state = reader.array("<f8").tolist()
+
+        self.snapshot = LevelSnapshot(self.level_number, tiles, rooms, (start_x, start_y), (exit_x, exit_y),
+                                      enemies, items, obstacles, pickups)
+
+    def prepare_game(self, game):
+        """Semilla, generadores, nivel objetivo, jugador y moto de la partida guardada."""
+        game.rng = GameRandom(self.seed)
+        game.seed = self.seed
+        for rng, rng_state in zip((game.rng.ai, game.rng.loot, game.rng.ui), self.rng_states):
+            rng.setstate(rng_state)
+        game.target_level_number = self.level_number
+        game.pregenerated_level = None
+
+        player = Player(game, *self.player_pos)
+        (player.current_hp, player.max_hp, player.base_attack, player.base_defense, player.attack,
+         player.defense, player.cooldown_powerful_attack, player.max_cooldown_powerful_attack) = self.player_stats
+        player.status_effects = self.status_effects
+        inventory = player.inventory
+        inventory.capacity, inventory.selected_item_index, weapon_index, armor_index = self.inventory_state
+        inventory.items = [create_item(game, item_id) for item_id in self.inventory_items]
+        inventory.equipped_weapon = inventory.items[weapon_index] if weapon_index >= 0 else None
+        inventory.equipped_armor = inventory.items[armor_index] if armor_index >= 0 else None
+
+        motorcycle = Motorcycle(game)
+        motorcycle.fuel_max, motorcycle.fuel_current, motorcycle.max_hp, motorcycle.current_hp = self.motorcycle_state
+        game.persistent_player = player
+        game.persistent_motorcycle = motorcycle
+
+    def apply(self, state):
+        """Lo que el snapshot no lleva: estado completo de los enemigos, turno y visibilidad."""
+        state.turn_count = self.turn_count
+        state.awaiting_powerful_attack_target = self.awaiting_powerful_attack_target
+
+        # _initialize_level creó los enemigos en el orden guardado: fila i = enemigo i
+        enemy_count = len(state.enemies)
+        for name, values in self.enemy_columns.items():
+            state.enemy_store.columns[name][:enemy_count] = values
+        for enemy, patrol_target, last_known in zip(state.enemies, self.patrol_targets, self.last_known_player_positions):
+            enemy.patrol_target = tuple(patrol_target) if patrol_target[0] >= 0 else None
+            enemy.last_known_player_pos = tuple(last_known) if last_known[0] >= 0 else None
+
+        current_map = state.current_map
+        current_map.visibility_map[:] = self.visibility
+        xs, ys = np.nonzero(self.visibility == 2)
+        current_map.visible_cells = frozenset(zip(xs.tolist(), ys.tolist()))
+        current_map.render_full_redraw = True
+        state.player.x, state.player.y = self.player_pos
+        current_map.update_fov(state.player.x, state.player.y)
+        state.camera.update()
+
+        # Caminos cacheados, válidos para el mapa recién cargado (su revisión ya no es la del original)
+        for enemy, path, path_goal in zip(state.enemies, self.enemy_paths, self.path_goals):
+            enemy.path = list(path)
+            enemy.path_goal = tuple(path_goal) if path else None
+            enemy.path_revision = current_map.revision if path else -1
+
+
+def read_save(path=SAVE_FILE):
+    """Lee una partida guardada con save_game. Lanza SaveError si el fichero no vale."""
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        magic, version, flags, payload_size = HEADER.unpack_from(data)
+        if magic != SAVE_MAGIC or version != SAVE_VERSION:
+            raise SaveError(f"{path}: no es una partida guardada (versión {SAVE_VERSION})")
+        payload = data[HEADER.size:]
+        if flags & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        if len(payload) != payload_size:
+            raise SaveError(f"{path}: fichero incompleto")
+        saved = SavedGame(_Reader(payload))
+    except (struct.error, ValueError, IndexError, KeyError, zlib.error) as e:
+        raise SaveError(f"{path}: fichero dañado ({e})") from e
+    log.info("Partida leída de %s (%.1f ms).", path, (time.perf_counter() - start) * 1000.0)
+    return saved
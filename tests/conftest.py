@@ -0,0 +1,15 @@
+# tests/conftest.py
+# Las pruebas usan el juego real en modo headless: se ejecutan desde la raíz del
+# repositorio (datos y assets van con rutas relativas) con: python -m pytest tests
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
@@ -0,0 +1,61 @@
+# tests/test_enemy.py
+import pygame
+import pytest
+from enemy import Enemy
+from headless import HeadlessGame
+
+
+def spawn_near_player(state, enemy_type, distance):
+    """Deja al jugador en el centro de la habitación más grande y pone un enemigo en
+    estado attack a `distance` tiles, en la misma fila."""
+    current_map = state.current_map
+    room = max(current_map.room_rects, key=lambda room: room.width * room.height)
+    player = state.player
+    player.x, player.y = room.left + room.width // 2, room.top + room.height // 2
+    for enemy in list(state.enemies): # Sitio libre alrededor
+        state.current_map.occupancy.remove("enemy", enemy)
+    state.enemies = []
+    for obstacle in current_map.occupancy.get_all("obstacle", player.x + distance, player.y):
+        current_map.occupancy.remove("obstacle", obstacle)
+    enemy = Enemy(state.game, player.x + distance, player.y, enemy_type, room_rect=room)
+    enemy.state = "attack"
+    state.spawn_enemy(enemy)
+    current_map.bump_revision()
+    return enemy
+
+
+@pytest.mark.parametrize("distance", [1, 2])
+def test_acid_spitter_backs_away_when_too_close(distance):
+    headless = HeadlessGame(seed=3, log_level="WARNING")
+    headless.new_game(3)
+    state = headless.state
+    spitter = spawn_near_player(state, "acid_spitter", distance)
+    spitter.special_attack_cooldown = 2 # Sin ácido este turno: solo cuenta el movimiento
+    player = state.player
+    hp_before = player.current_hp
+
+    spitter._act_attack(player, state.current_map, state.enemies, distance)
+
+    assert abs(spitter.x - player.x) + abs(spitter.y - player.y) > distance
+    assert player.current_hp == hp_before
+
+
+@pytest.mark.parametrize("roll, drops", [(0.0, True), (0.99, False)])
+def test_killing_an_enemy_rolls_its_drop_table(roll, drops, monkeypatch):
+    headless = HeadlessGame(seed=3, log_level="WARNING")
+    headless.new_game(3)
+    state = headless.state
+    grunt = spawn_near_player(state, "basic_grunt", 1)
+    grunt.current_hp = 1
+    monkeypatch.setattr(headless.game.rng.loot, "random", lambda: roll)
+    items_before = len(state.items_on_map)
+
+    headless.press_key(pygame.K_RIGHT) # Atacar al enemigo de la derecha
+
+    assert not grunt.is_alive and grunt not in state.enemies
+    dropped = state.items_on_map[items_before:]
+    if drops:
+        assert [(item.item_id, item.x, item.y) for item in dropped] == [("coffee", grunt.x, grunt.y)]
+        assert state.current_map.occupancy.get("item", grunt.x, grunt.y) is dropped[0]
+    else:
+        assert dropped == []
@@ -0,0 +1,81 @@
+# tests/test_enemy_store.py
+import random
+
+import pygame
+import pytest
+from enemy_store import LOSE_TRACK_DISTANCE, WAKE_DISTANCE
+from headless import MOVE_KEYS, HeadlessGame
+from replay_log import state_checksum
+
+TURNS = 150
+STEP_KEYS = {(0, -1): pygame.K_UP, (0, 1): pygame.K_DOWN, (-1, 0): pygame.K_LEFT, (1, 0): pygame.K_RIGHT}
+
+
+def reference_turn(enemies, player, current_map):
+    """La IA enemigo a enemigo, como antes de EnemyStore: referencia para process_turn."""
+    for enemy in enemies:
+        if player.current_hp <= 0:
+            break
+        if not enemy.is_alive:
+            continue
+        if enemy.special_attack_cooldown > 0:
+            enemy.special_attack_cooldown -= 1
+        distance = enemy._get_distance_to_player(player)
+        if enemy.state == "idle":
+            if distance <= WAKE_DISTANCE:
+                enemy._notice_player()
+        elif enemy.state == "surprised":
+            enemy.surprise_timer -= 1
+            if enemy.surprise_timer <= 0:
+                enemy._recover_from_surprise()
+        elif enemy.state == "alert":
+            enemy._behavior_alert(player, current_map, enemies)
+        elif enemy.state == "attack":
+            player_room = current_map.get_room_at(player.x, player.y)
+            enemy_room = current_map.get_room_at(enemy.x, enemy.y)
+            if distance > LOSE_TRACK_DISTANCE and (player_room != enemy_room or not player_room or not enemy_room):
+                enemy._lose_track_of_player(player)
+            else:
+                enemy._act_attack(player, current_map, enemies, distance)
+
+
+def key_towards_enemies(state, rng):
+    """Casi siempre un paso (por A*) hacia el enemigo vivo más cercano, para que despierten y ataquen."""
+    player = state.player
+    targets = sorted((abs(enemy.x - player.x) + abs(enemy.y - player.y), enemy.x, enemy.y)
+                     for enemy in state.enemies if enemy.is_alive)
+    if targets and rng.random() < 0.8:
+        path = state.current_map.find_path((player.x, player.y), targets[0][1:])
+        if path:
+            dx, dy = path[0][0] - player.x, path[0][1] - player.y
+            return STEP_KEYS[dx, dy]
+    return rng.choice(MOVE_KEYS)
+
+
+def play_first_level(seed, use_reference):
+    """Checksums tras cada turno del nivel 1, con todos los enemigos en cada turno."""
+    headless = HeadlessGame(seed=seed, log_level="WARNING")
+    headless.new_game(seed)
+    state = headless.state
+    state.enemy_scheduler.get_turn_indices = lambda player: None # Sin aparcar a nadie
+    state.enemy_scheduler.update_after_turn = lambda indices: None
+    if use_reference:
+        store = state.enemy_store
+        store.process_turn = lambda player, current_map, indices=None: reference_turn(store.enemies, player, current_map)
+
+    keys = random.Random(seed)
+    checksums = []
+    while len(checksums) < TURNS and headless.state is state:
+        state.player.current_hp = state.player.max_hp # Que la partida dure los TURNS turnos
+        turns_before = state.turn_count
+        headless.press_key(key_towards_enemies(state, keys))
+        if headless.state is state and state.turn_count != turns_before:
+            checksums.append(state_checksum(state))
+    return checksums
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4, 5])
+def test_process_turn_matches_per_enemy_ai(seed):
+    expected = play_first_level(seed, use_reference=True)
+    assert play_first_level(seed, use_reference=False) == expected
+    assert len(expected) > 0
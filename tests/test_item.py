@@ -0,0 +1,21 @@
+# tests/test_item.py
+from types import SimpleNamespace
+
+import item
+import pytest
+from item import Weapon, create_item, get_item_definitions
+
+
+def test_create_item_builds_the_defined_type():
+    weapon = create_item(SimpleNamespace(), "wrench")
+    assert isinstance(weapon, Weapon)
+    assert weapon.item_id == "wrench"
+    assert weapon.name == get_item_definitions()["wrench"]["name"]
+
+
+def test_create_item_rejects_unknown_item_type(monkeypatch):
+    get_item_definitions() # Cargar data/items.json antes de añadir la definición de prueba
+    monkeypatch.setitem(item._item_definitions, "broken", {"type": "trinket", "name": "Roto",
+                                                         "description": "", "image": ""})
+    with pytest.raises(ValueError, match="trinket"):
+        create_item(SimpleNamespace(), "broken")
@@ -0,0 +1,19 @@
+# tests/test_replay_log.py
+import pytest
+from headless import HeadlessGame
+from replay import run_replay
+from replay_log import ReplayRecorder, read_replay
+
+
+@pytest.mark.parametrize("seed", [11, "partida de prueba", -7])
+def test_recorded_run_replays_identically(seed, tmp_path):
+    headless = HeadlessGame(seed=seed, log_level="WARNING")
+    headless.new_game(seed)
+    game = headless.game
+    game.replay_recorder = ReplayRecorder(str(tmp_path / "run.replay"), game.seed)
+    headless.step_turns(40)
+    game.replay_recorder.close()
+
+    recorded_seed, turns = read_replay(game.replay_recorder.path)
+    assert recorded_seed == game.seed
+    assert len(run_replay(game.replay_recorder.path, log_level="WARNING")) == len(turns) > 0
@@ -0,0 +1,57 @@
+# tests/test_save_game.py
+import random
+
+import pytest
+from headless import MOVE_KEYS, HeadlessGame
+from replay_log import state_checksum
+
+TURNS_BEFORE_SAVE = 60
+TURNS_AFTER_LOAD = 60
+
+
+def play(headless, keys):
+    """Pulsa `keys` en orden; devuelve el checksum del estado tras cada turno resuelto."""
+    checksums = []
+    for key in keys:
+        state = headless.state
+        if not hasattr(state, "turn_count"):
+            break # Fin de la partida o transición: se compara hasta aquí
+        turns_before = state.turn_count
+        headless.press_key(key)
+        if getattr(headless.state, "turn_count", turns_before) != turns_before:
+            checksums.append(state_checksum(headless.state))
+    return checksums
+
+
+@pytest.mark.parametrize("seed", [2, 5, 7])
+def test_loaded_game_continues_like_the_original(seed, tmp_path):
+    """Guardar, cargar y seguir jugando da los mismos estados que no haber cargado."""
+    keys = random.Random(seed)
+    original = HeadlessGame(seed=seed, log_level="WARNING")
+    original.new_game(seed)
+    original.step_turns(TURNS_BEFORE_SAVE, choose_key=lambda _: keys.choice(MOVE_KEYS))
+    path = str(tmp_path / "test.sav")
+    assert original.game.save_current_game(path)
+
+    continuation = [keys.choice(MOVE_KEYS) for _ in range(TURNS_AFTER_LOAD)]
+    expected = play(original, continuation)
+
+    loaded = HeadlessGame(log_level="WARNING")
+    assert loaded.game.load_saved_game(path)
+    assert play(loaded, continuation) == expected
+    assert len(expected) > 0
+
+
+@pytest.mark.parametrize("seed", ["partida de prueba", -7, 2 ** 70])
+def test_save_accepts_any_seed(seed, tmp_path):
+    """Semillas de config.json o de la línea de comandos que no son un uint64."""
+    original = HeadlessGame(seed=seed, log_level="WARNING")
+    original.new_game(seed)
+    original.step_turns(10)
+    path = str(tmp_path / "test.sav")
+    assert original.game.save_current_game(path)
+
+    loaded = HeadlessGame(log_level="WARNING")
+    assert loaded.game.load_saved_game(path)
+    assert loaded.game.seed == original.game.seed
+    assert state_checksum(loaded.state) == state_checksum(original.state)
@@ -58,6 +58,15 @@ COLOR_EXIT = RED
 COLOR_ABYSS = BLACK
 COLOR_OBJECT = BLUE
 
+# --- Variantes tintadas de imágenes (se generan una vez en Game.load_assets) ---
+# nombre: (color RGBA, modo). "overlay" compone un velo encima de la imagen;
+# "add" suma el color a los píxeles respetando su transparencia.
+IMAGE_TINTS = {
+    "explored": ((0, 0, 0, 150), "overlay"),      # Niebla de guerra: tile explorado pero no visible
+    "damage_flash": ((120, 0, 0, 0), "add"),      # Destello rojo al recibir daño
+}
+DAMAGE_FLASH_DURATION = 150 # ms que se ve el destello "damage_flash" tras un golpe
+
 # --- Colores para el Medidor de Combustible ---
 COLOR_FUEL_BACKGROUND = (0, 0, 0)      # Negro
 COLOR_FUEL_BORDER = (57, 255, 20)     # Verde fosforito (como los LCD antiguos)